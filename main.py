@@ -171,9 +171,12 @@ def main():
         )
         
         # Create application with network configuration
+        # bot.http_version 设为 "2" 时启用HTTP/2多路复用（需要 httpx[http2]）
         from telegram.request import HTTPXRequest
+        http_version = config.http_version
         request = HTTPXRequest(
-            connection_pool_size=8,
+            http_version=http_version,
+            connection_pool_size=64 if http_version == '2' else 8,
             connect_timeout=10.0,
             read_timeout=30.0,
             write_timeout=30.0,
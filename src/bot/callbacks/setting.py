@@ -12,7 +12,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from ..commands.setting import CONFIG_CATEGORIES, get_config_item_info, get_current_value, validate_config_value
+from ..commands.setting import CONFIG_CATEGORIES, get_config_item_info, get_current_value, get_current_values, validate_config_value
 from ...utils.config import get_config
 
 logger = logging.getLogger(__name__)
@@ -44,7 +44,7 @@ async def handle_setting_category_callback(update: Update, context: ContextTypes
         # 使用MessageBuilder格式化分类菜单
         from ...utils.message_builder import MessageBuilder
         text, reply_markup = MessageBuilder.format_setting_category_menu(
-            category_key, category_info, get_current_value
+            category_key, category_info, get_current_value, get_current_values
         )
         
         await query.edit_message_text(
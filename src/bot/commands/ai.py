@@ -35,7 +35,7 @@ async def ai_status_command(update: Update, context: ContextTypes.DEFAULT_TYPE,
         from ...utils.message_builder import MessageBuilder
         # 添加user_id到context以便MessageBuilder访问
         context._user_id = update.effective_user.id
-        status_text = MessageBuilder.format_ai_status(ai_config, context, lang_ctx)
+        status_text = MessageBuilder.format_ai_status(ai_config, context, lang_ctx, config.ai_view)
         
         await send_or_update_reply(
             update,
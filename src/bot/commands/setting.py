@@ -208,6 +208,20 @@ def get_current_value(config_key: str):
     return config.get(config_key)
 
 
+def get_current_values(config_keys: list[str]) -> dict:
+    """
+    批量获取多个配置项的当前值
+    
+    Args:
+        config_keys: 配置键列表
+        
+    Returns:
+        {配置键: 当前配置值}
+    """
+    config = get_config()
+    return {config_key: config.get(config_key) for config_key in config_keys}
+
+
 def validate_config_value(config_key: str, value: str) -> tuple[bool, any, str]:
     """
     验证配置值
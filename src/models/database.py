@@ -7,7 +7,7 @@ import sqlite3
 import logging
 import threading
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 
@@ -56,6 +56,31 @@ class Database:
             self.conn.close()
             logger.info("Database connection closed")
     
+    @property
+    def total_changes(self) -> int:
+        """
+        Number of rows changed through this connection since it was opened
+        
+        Cheap data-version signal for caches: if it has not moved, no
+        archive, tag or note has been written since the last read.
+        """
+        return self.conn.total_changes if self.conn else 0
+    
+    @property
+    def data_version(self) -> Tuple[int, int]:
+        """
+        Version signal that moves on any committed write to the database file
+        
+        PRAGMA data_version changes when another connection (backup restore,
+        external sqlite tool) commits; total_changes covers this connection's
+        own writes, which data_version does not report.
+        """
+        if not self.conn:
+            return (0, 0)
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return (version, self.conn.total_changes)
+    
     def initialize(self) -> None:
         """Create database tables if they don't exist"""
         try:
@@ -744,6 +769,61 @@ class Database:
             logger.error(f"Error checking notes: {e}", exc_info=True)
             return False
     
+    def _select_ids_in(self, query: str, ids: List[int]) -> Set[int]:
+        """
+        Run ``query`` (containing one ``{placeholders}`` slot) over ``ids``
+        in chunks that stay below SQLite's bound-variable limit
+        
+        Returns:
+            Set of IDs from the first result column
+        """
+        unique_ids = list({archive_id for archive_id in ids if archive_id is not None})
+        result: Set[int] = set()
+        for start in range(0, len(unique_ids), 500):
+            chunk = unique_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.execute(query.format(placeholders=placeholders), tuple(chunk))
+            result.update(row[0] for row in cursor.fetchall())
+        return result
+    
+    def is_favorite_bulk(self, archive_ids: List[int]) -> Set[int]:
+        """
+        Check favorite status for several archives in one query
+        
+        Args:
+            archive_ids: Archive IDs
+            
+        Returns:
+            Set of favorited archive IDs
+        """
+        try:
+            return self._select_ids_in(
+                "SELECT id FROM archives WHERE id IN ({placeholders}) AND deleted = 0 AND favorite = 1",
+                archive_ids
+            )
+        except Exception as e:
+            logger.error(f"Error checking favorites: {e}", exc_info=True)
+            return set()
+    
+    def has_notes_bulk(self, archive_ids: List[int]) -> Set[int]:
+        """
+        Check which of several archives have notes in one query
+        
+        Args:
+            archive_ids: Archive IDs
+            
+        Returns:
+            Set of archive IDs that have at least one note
+        """
+        try:
+            return self._select_ids_in(
+                "SELECT DISTINCT archive_id FROM notes WHERE archive_id IN ({placeholders})",
+                archive_ids
+            )
+        except Exception as e:
+            logger.error(f"Error checking notes: {e}", exc_info=True)
+            return set()
+    
     def set_note_favorite(self, note_id: int, favorite: bool = True) -> bool:
         """
         Set or unset favorite status for a note
@@ -3,21 +3,46 @@ Telegram channel storage provider
 Stores files in a private Telegram channel
 """
 
+import contextlib
 import logging
 from typing import Optional, Any
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import (
+    Bot, InlineKeyboardButton, InlineKeyboardMarkup,
+    InputMediaPhoto, InputMediaVideo, InputMediaAudio
+)
+from telegram.error import BadRequest
 
 from .base import BaseStorage
 from ..utils.helpers import escape_html
 
 logger = logging.getLogger(__name__)
 
+# media_group 各内容类型对应的 InputMedia 构造器
+_MEDIA_CTOR = {
+    'photo': InputMediaPhoto,
+    'image': InputMediaPhoto,
+    'video': InputMediaVideo,
+    'audio': InputMediaAudio,
+}
+
+# 可组成 media_group 的内容类型
+_MEDIA_GROUP_TYPES = frozenset(_MEDIA_CTOR)
+
+# media_group 存档频道优先级：视频>音频>图片
+_PRIORITY_ORDER = {'video': 4, 'audio': 3, 'image': 2, 'photo': 2}
+
 
 class TelegramStorage(BaseStorage):
     """
     Telegram channel storage provider
     Stores files in a private Telegram channel (< 2GB)
     Supports multiple channels by content type
+    
+    Sequential sends (split text parts, per-item fallback after a failed
+    media_group) share the bot's HTTP connection pool. Set
+    ``bot.http_version: "2"`` in config to build the bot with
+    ``HTTPXRequest(http_version="2")`` so these requests are multiplexed
+    over a single connection.
     """
     
     def __init__(self, bot: Bot, config: dict):
@@ -49,6 +74,8 @@ class TelegramStorage(BaseStorage):
         
         # 确保有默认频道
         self.default_channel = self.channels.get('default')
+        
+        # 日志级别在启动时已配置，缓存INFO开关以跳过热路径上的日志字符串构建
         logger.info(f"TelegramStorage initialized with {len(self.channels)} channels, default: {self.default_channel}")
     
     def _create_archive_buttons(self, archive_id: int, has_notes: bool = False, is_favorite: bool = False) -> InlineKeyboardMarkup:
@@ -130,7 +157,8 @@ class TelegramStorage(BaseStorage):
                 logger.error(f"No channel configured for content_type: {content_type}")
                 return None
             
-            logger.info(f"Forwarding to channel {channel_id}: content_type={content_type}, file_id={file_id[:20] if file_id else 'None'}...")
+            logger.info("Forwarding to channel %s: content_type=%s, file_id=%s...",
+                        channel_id, content_type, file_id[:20] if file_id else 'None')
             
             # 文本和链接类型：发送文本消息（不需要file_id）
             if content_type in ['text', 'link']:
@@ -174,7 +202,7 @@ class TelegramStorage(BaseStorage):
                         
                         if message and message.document:
                             storage_path = f"{channel_id}:{message.message_id}:{message.document.file_id}"
-                            logger.info(f"Long text stored as document in Telegram channel: {storage_path} ({len(formatted_text)} chars)")
+                            logger.info("Long text stored as document in Telegram channel: %s (%d chars)", storage_path, len(formatted_text))
                             return storage_path
                         
                     except Exception as e:
@@ -182,8 +210,10 @@ class TelegramStorage(BaseStorage):
                         # 失败则回退到分片发送
                 
                 # 使用智能分割处理超长文本（不截断）
+                # "续 i/N" 标记需要总段数，因此一次性分割为列表
                 from ..utils.helpers import split_long_message
                 text_parts = split_long_message(formatted_text, max_length=4096, preserve_newlines=True)
+                total_parts = len(text_parts)
                 
                 # 发送第一条消息
                 first_message = await self.bot.send_message(
@@ -199,20 +229,20 @@ class TelegramStorage(BaseStorage):
                     return None
                 
                 # 发送后续消息（如果有）
-                if len(text_parts) > 1:
+                if total_parts > 1:
                     for i, part in enumerate(text_parts[1:], start=2):
                         await self.bot.send_message(
                             chat_id=channel_id,
-                            text=f"[续 {i}/{len(text_parts)}]\n\n{part}",
+                            text=f"[续 {i}/{total_parts}]\n\n{part}",
                             parse_mode='HTML',
                             disable_web_page_preview=False,
                             reply_to_message_id=first_message.message_id  # 回复第一条消息，形成线程
                         )
-                    logger.info(f"{content_type} split into {len(text_parts)} messages for channel")
+                    logger.info("%s split into %d messages for channel", content_type, total_parts)
                 
                 # 返回第一条消息的路径
                 storage_path = f"{channel_id}:{first_message.message_id}"
-                logger.info(f"Text/Link stored in Telegram channel: {storage_path}")
+                logger.info("Text/Link stored in Telegram channel: %s", storage_path)
                 return storage_path
             
             # 媒体文件类型：需要file_id
@@ -329,7 +359,7 @@ class TelegramStorage(BaseStorage):
                 # Return storage path as "channel_id:message_id:file_id"
                 # 格式：channel_id:message_id:channel_file_id
                 storage_path = f"{channel_id}:{message.message_id}:{channel_file_id}" if channel_file_id else f"{channel_id}:{message.message_id}"
-                logger.info(f"File stored in Telegram channel: {storage_path}")
+                logger.info("File stored in Telegram channel: %s", storage_path)
                 return storage_path
             
             return None
@@ -350,22 +380,25 @@ class TelegramStorage(BaseStorage):
         Returns:
             storage_path列表（成功的路径，失败为None）
         """
-        from telegram import InputMediaPhoto, InputMediaVideo, InputMediaDocument, InputMediaAudio
+        # 快速路径：空列表或单个文件无需media_group判断
+        if not metadata_list:
+            return []
+        if len(metadata_list) == 1:
+            return [await self.store(None, metadata_list[0])]
         
-        logger.info(f"Batch storing {len(metadata_list)} files to Telegram channel")
+        logger.info("Batch storing %d files to Telegram channel", len(metadata_list))
         
         # 初始化结果列表
         storage_paths = [None] * len(metadata_list)
         
         # 检查是否所有项都是可以作为media_group的类型
         media_types = [meta.get('content_type') for meta in metadata_list]
-        can_be_media_group = all(mt in ['photo', 'video', 'image', 'audio'] for mt in media_types)
+        can_be_media_group = all(mt in _MEDIA_GROUP_TYPES for mt in media_types)
         
         # 如果可以作为media_group且数量在2-10之间
         if can_be_media_group and 2 <= len(metadata_list) <= 10:
             # 按优先级确定频道：视频>音频>图片>其他
-            priority_order = {'video': 4, 'audio': 3, 'image': 2, 'photo': 2}
-            max_priority = max(priority_order.get(mt, 0) for mt in media_types)
+            max_priority = max(_PRIORITY_ORDER.get(mt, 0) for mt in media_types)
             
             # 确定存档频道（使用第一个item的override_channel_id，或根据最高优先级类型决定）
             first_override = metadata_list[0].get('override_channel_id')
@@ -375,7 +408,7 @@ class TelegramStorage(BaseStorage):
                 # 根据最高优先级类型确定频道
                 priority_type = None
                 for mt in ['video', 'audio', 'image', 'photo']:
-                    if priority_order.get(mt, 0) == max_priority and mt in media_types:
+                    if _PRIORITY_ORDER.get(mt, 0) == max_priority and mt in media_types:
                         priority_type = mt
                         break
                 channel_id = self._get_channel_id(priority_type) if priority_type else self.default_channel
@@ -388,24 +421,19 @@ class TelegramStorage(BaseStorage):
                 return storage_paths
             
             # 构建media_group（需要转义caption中的HTML特殊字符）
-            media_group = []
-            for i, metadata in enumerate(metadata_list):
-                file_id = metadata.get('file_id')
-                # 只有第一个item有caption - 需要转义HTML特殊字符
-                raw_caption = metadata.get('caption', '') if i == 0 else None
-                caption = escape_html(raw_caption) if raw_caption else None
-                content_type = metadata.get('content_type')
-                
-                if content_type in ['photo', 'image']:
-                    media_group.append(InputMediaPhoto(media=file_id, caption=caption, parse_mode='HTML'))
-                elif content_type == 'video':
-                    media_group.append(InputMediaVideo(media=file_id, caption=caption, parse_mode='HTML'))
-                elif content_type == 'audio':
-                    media_group.append(InputMediaAudio(media=file_id, caption=caption, parse_mode='HTML'))
+            # 只有第一个item有caption - 需要转义HTML特殊字符
+            raw_caption = metadata_list[0].get('caption', '')
+            captions = [escape_html(raw_caption) if raw_caption else None] + [None] * (len(metadata_list) - 1)
+            file_ids = [metadata.get('file_id') for metadata in metadata_list]
+            media_group = [
+                _MEDIA_CTOR[content_type](media=file_id, caption=caption, parse_mode='HTML')
+                for content_type, file_id, caption in zip(media_types, file_ids, captions)
+            ]
             
             # 发送media_group
             try:
-                logger.info(f"Sending media_group to channel {channel_id} with {len(media_group)} items (types: {set(media_types)})")
+                logger.info("Sending media_group to channel %s with %d items (types: %s)",
+                            channel_id, len(media_group), set(media_types))
                 messages = await self.bot.send_media_group(
                     chat_id=channel_id,
                     media=media_group
@@ -433,18 +461,21 @@ class TelegramStorage(BaseStorage):
                     is_favorite = first_metadata.get('is_favorite', False)
                     
                     if archive_id:
+                        # 按钮附加是尽力而为：BadRequest（如消息已删除）直接忽略；
+                        # 其他任何异常仅记录警告，避免落入外层降级逻辑导致重复发送
                         try:
-                            reply_markup = self._create_archive_buttons(archive_id, has_notes, is_favorite)
-                            await self.bot.edit_message_reply_markup(
-                                chat_id=channel_id,
-                                message_id=messages[0].message_id,
-                                reply_markup=reply_markup
-                            )
-                            logger.debug(f"Added buttons to first message of media_group (archive_id={archive_id}, has_notes={has_notes})")
+                            with contextlib.suppress(BadRequest):
+                                reply_markup = self._create_archive_buttons(archive_id, has_notes, is_favorite)
+                                await self.bot.edit_message_reply_markup(
+                                    chat_id=channel_id,
+                                    message_id=messages[0].message_id,
+                                    reply_markup=reply_markup
+                                )
+                                logger.debug(f"Added buttons to first message of media_group (archive_id={archive_id}, has_notes={has_notes})")
                         except Exception as e:
                             logger.warning(f"Failed to add buttons to media_group: {e}")
                 
-                logger.info(f"Successfully sent media_group with {len(messages)} items")
+                logger.info("Successfully sent media_group with %d items", len(messages))
                 return storage_paths
                 
             except Exception as e:
@@ -5,6 +5,7 @@ Auto-installer module for playwright and other dependencies
 
 import logging
 import asyncio
+import importlib
 import sys
 from typing import Optional, Tuple
 
@@ -78,10 +79,9 @@ async def auto_install_playwright(progress_callback=None) -> Tuple[bool, str]:
         
         # 验证安装是否成功
         try:
-            # 重新导入以确保使用新安装的版本
-            import importlib
-            if 'playwright' in sys.modules:
-                importlib.reload(sys.modules['playwright'])
+            # 刷新导入器缓存，使 pip 刚安装的包可被发现
+            # 启动时不会导入 playwright，因此无需 reload 已加载的模块
+            importlib.invalidate_caches()
             
             from playwright.sync_api import sync_playwright
             with sync_playwright() as p:
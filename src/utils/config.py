@@ -4,14 +4,208 @@ Supports environment variable override for sensitive information
 Priority: Environment Variables > YAML Config
 """
 
+import copy
+import functools
+import json
 import os
+import tempfile
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 import logging
 
+# 优先使用 libyaml 的C实现（语义与纯Python版一致，速度快约10倍）
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
 logger = logging.getLogger(__name__)
 
+# 环境变量映射（敏感信息和频道配置）
+_ENV_MAPPING = {
+    'bot.token': 'BOT_TOKEN',
+    'bot.owner_id': 'OWNER_ID',
+    'storage.telegram.channels.default': 'CHANNEL_DEFAULT',
+    'storage.telegram.channels.text': 'CHANNEL_TEXT',
+    'storage.telegram.channels.ebook': 'CHANNEL_EBOOK',
+    'storage.telegram.channels.document': 'CHANNEL_DOCUMENT',
+    'storage.telegram.channels.image': 'CHANNEL_IMAGE',
+    'storage.telegram.channels.media': 'CHANNEL_MEDIA',
+    'storage.telegram.channels.note': 'CHANNEL_NOTE',
+    'storage.telegram.direct_send.channels.default': 'CHANNEL_DIRECT_DEFAULT',
+    'ai.api.provider': 'AI_API_PROVIDER',
+    'ai.api.api_key': 'AI_API_KEY',
+    'ai.api.api_url': 'AI_API_URL',
+    'ai.api.model': 'AI_MODEL',
+    'ai.api.reasoning_model': 'AI_REASONING_MODEL',
+    'ai.exclude_from_context.channel_ids': 'AI_EXCLUDE_CHANNELS',
+    'ai.exclude_from_context.tags': 'AI_EXCLUDE_TAGS',
+    'bot.silent_sources': 'SILENT_SOURCES',
+}
+
+# 频道ID类型的环境变量键（转换为int，0表示未配置）
+_CHANNEL_ENV_KEYS = frozenset(
+    key for key in _ENV_MAPPING
+    if key.startswith(('storage.telegram.channels.', 'storage.telegram.direct_send.channels.'))
+)
+
+# 列表类型的环境变量键（JSON格式或逗号分隔）
+_LIST_ENV_KEYS = frozenset({
+    'ai.exclude_from_context.channel_ids',
+    'ai.exclude_from_context.tags',
+    'bot.silent_sources',
+})
+
+# YAML解析结果缓存：(路径, mtime_ns, 文件大小) -> 解析后的配置字典
+# 文件未变化时复用解析结果，避免重复解析（仅保留最近一次解析；返回深拷贝，防止 set() 污染缓存）
+_PARSE_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+# get() 缓存哨兵：尚未缓存 / 配置不存在（返回调用方的default）
+_NOT_CACHED = object()
+_MISSING = object()
+
+# 环境变量值无法转换时的哨兵（回退到YAML配置）
+_INVALID = object()
+
+# bot.http_version 的可接受写法 -> HTTPXRequest 使用的值（YAML 中的 2 / 2.0 会被解析为数字）
+_HTTP_VERSIONS = {'1.1': '1.1', '2': '2', '2.0': '2'}
+
+
+@functools.lru_cache(maxsize=512)
+def _split_path(key: str) -> Tuple[str, ...]:
+    """Split a dot-separated key path once and reuse the tuple"""
+    return tuple(key.split('.'))
+
+
+def _int_or_str(item: str) -> Any:
+    """Convert a list item to int (channel ID) if possible, else keep the string (username)"""
+    try:
+        return int(item)
+    except ValueError:
+        return item
+
+
+def _identity(env_value: str) -> Any:
+    """Plain string environment variable"""
+    return env_value
+
+
+def _to_int(env_value: str) -> Any:
+    """Integer environment variable (e.g. OWNER_ID)"""
+    try:
+        return int(env_value)
+    except ValueError:
+        return _INVALID
+
+
+def _to_channel_id(env_value: str) -> Any:
+    """Channel ID environment variable; 0 means not configured"""
+    try:
+        val = int(env_value)
+    except ValueError:
+        return _INVALID
+    # 0表示未配置，返回None让系统使用默认逻辑
+    return val if val != 0 else None
+
+
+def _to_list(env_value: str) -> Any:
+    """List environment variable (JSON or comma-separated)"""
+    try:
+        # 优先尝试JSON格式
+        return json.loads(env_value)
+    except (json.JSONDecodeError, ValueError):
+        # 降级为逗号分隔格式
+        raw_items = env_value.split(',')
+        if len(raw_items) > 1:
+            # 尝试转换为整数（频道ID），失败则保留字符串（用户名）
+            return [_int_or_str(item) for item in map(str.strip, raw_items) if item]
+        return _INVALID
+
+
+# 环境变量类型转换分派表：配置键 -> 转换函数（转换失败返回 _INVALID）
+_CONVERTERS = {
+    'bot.owner_id': _to_int,
+    **{key: _to_channel_id for key in _CHANNEL_ENV_KEYS},
+    **{key: _to_list for key in _LIST_ENV_KEYS},
+}
+
+
+def _env_override(key: str) -> Any:
+    """
+    Environment variable override for a config key (see _ENV_MAPPING)
+    
+    Args:
+        key: Dot-separated key path
+        
+    Returns:
+        Converted env value, or _MISSING if unset, empty or invalid
+    """
+    env_var = _ENV_MAPPING.get(key)
+    if env_var:
+        env_value = os.getenv(env_var)
+        if env_value is not None and env_value != '':
+            # 类型转换（按键分派，未登记的键原样返回字符串）
+            value = _CONVERTERS.get(key, _identity)(env_value)
+            if value is not _INVALID:
+                return value
+            logger.warning(f"Invalid {env_var} value: {env_value}, using YAML config")
+    return _MISSING
+
+
+def _with_env(key: str, yaml_value: Any) -> Any:
+    """Return the env override for key if set, else the YAML value"""
+    value = _env_override(key)
+    return yaml_value if value is _MISSING else value
+
+
+class AiConfigView(NamedTuple):
+    """
+    Flattened read-only view of the AI config section
+    Built once per config load with the _ENV_MAPPING overrides applied (the
+    environment, like the YAML, is treated as fixed between loads), so readers
+    use attribute access instead of walking nested dicts
+    """
+    enabled: bool
+    provider: str
+    model: str
+    api_key: str
+    base_url: str
+    max_tokens: int
+    timeout: int
+    temperature: float
+    auto_summarize: bool
+    auto_tags: bool
+    auto_category: bool
+    chat_enabled: bool
+    
+    @classmethod
+    def from_dict(cls, ai_config: Dict[str, Any]) -> 'AiConfigView':
+        """
+        Build a view from a raw ``ai`` config dict
+        
+        Args:
+            ai_config: The ``ai`` section of the config
+            
+        Returns:
+            AiConfigView with env > YAML precedence resolved
+        """
+        api_config = ai_config.get('api') or {}
+        return cls(
+            enabled=bool(ai_config.get('enabled', False)),
+            provider=_with_env('ai.api.provider', api_config.get('provider', '')) or 'unknown',
+            model=_with_env('ai.api.model', api_config.get('model', '')) or 'unknown',
+            api_key=_with_env('ai.api.api_key', api_config.get('api_key', '')) or '',
+            base_url=_with_env('ai.api.api_url', api_config.get('api_url', '')) or api_config.get('base_url', 'default'),
+            max_tokens=api_config.get('max_tokens', 1000),
+            timeout=api_config.get('timeout', 30),
+            temperature=api_config.get('temperature', 0.7),
+            auto_summarize=bool(ai_config.get('auto_summarize', False)),
+            auto_tags=bool(ai_config.get('auto_generate_tags', False)),
+            auto_category=bool(ai_config.get('auto_category', False)),
+            chat_enabled=bool(ai_config.get('chat_enabled', False)),
+        )
+
 
 class Config:
     """
@@ -19,6 +213,13 @@ class Config:
     Loads configuration from YAML file
     """
     
+    __slots__ = (
+        'config_path', '_config', '_cache', '_version',
+        # 常用属性的解析快照（load()/set() 时刷新）
+        '_bot_token', '_owner_id', '_language', '_database_path',
+        '_telegram_channel_id', '_telegram_channel_id_short', '_telegram_channels', '_ai', '_ai_view',
+    )
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize configuration
@@ -33,6 +234,11 @@ class Config:
         
         self.config_path = Path(config_path)
         self._config: Dict[str, Any] = {}
+        # get() 解析结果缓存：环境变量和YAML视为在两次 load() 之间不变（应用内不会修改 os.environ），
+        # AiConfigView 等派生快照同样基于这一前提；set()/load() 时清空
+        self._cache: Dict[str, Any] = {}
+        # 配置版本号：每次 load()/set() 后递增，供派生缓存判断是否需要重建
+        self._version = 0
         self.load()
     
     def load(self) -> None:
@@ -44,8 +250,17 @@ class Config:
                     f"Please copy config.template.yaml to config.yaml and configure it."
                 )
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+            stat = self.config_path.stat()
+            cache_key = (str(self.config_path.resolve()), stat.st_mtime_ns, stat.st_size)
+            parsed = _PARSE_CACHE.get(cache_key)
+            if parsed is None:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    parsed = yaml.load(f, Loader=_SafeLoader) or {}
+                _PARSE_CACHE.clear()
+                _PARSE_CACHE[cache_key] = parsed
+            self._config = copy.deepcopy(parsed)
+            self._cache.clear()
+            self._snapshot()
             
             logger.info(f"Configuration loaded from {self.config_path}")
             
@@ -62,35 +277,67 @@ class Config:
             logger.error(f"Error loading config: {e}", exc_info=True)
             raise
     
+    def _snapshot(self) -> None:
+        """Resolve the frequently read properties once so access is a plain attribute read"""
+        self._version += 1
+        self._bot_token = self.get('bot.token')
+        self._owner_id = self.get('bot.owner_id')
+        self._language = self.get('bot.language', 'zh-CN')
+        self._database_path = self.get('storage.database.path', 'data/archive.db')
+        self._telegram_channels = self.get('storage.telegram.channels', {})
+        self._ai = self.get('ai', {})
+        self._ai_view = AiConfigView.from_dict(self._ai or {})
+        
+        # 优先使用新配置，向后兼容旧的channel_id
+        channel_id = self.get('storage.telegram.channels.default')
+        if not channel_id:
+            channel_id = self.get('storage.telegram.channel_id')
+        self._telegram_channel_id = channel_id or None
+        
+        # t.me/c/ 链接使用的短格式（去掉 -100 前缀）
+        channel_str = str(self._telegram_channel_id)
+        self._telegram_channel_id_short = channel_str[4:] if channel_str.startswith('-100') else channel_str
+    
     def _validate(self) -> None:
         """Validate required configuration fields"""
-        required_fields = [
-            ('bot', 'token'),
-            ('bot', 'owner_id'),
-            ('storage', 'database', 'path'),
-        ]
+        # bot.token / bot.owner_id 已由 _snapshot() 解析（含环境变量覆盖），数据库路径直接读取
+        storage = self._config.get('storage') or {}
+        database = (storage.get('database') or {}) if isinstance(storage, dict) else {}
+        db_path = database.get('path') if isinstance(database, dict) else None
         
-        for field_path in required_fields:
-            value = self.get('.'.join(field_path))
+        required_fields = (
+            ('bot.token', self._bot_token),
+            ('bot.owner_id', self._owner_id),
+            ('storage.database.path', db_path),
+        )
+        
+        for field_name, value in required_fields:
             if value is None or value == "" or value == 0:
                 raise ValueError(
-                    f"Required configuration field is missing or empty: {'.'.join(field_path)}"
+                    f"Required configuration field is missing or empty: {field_name}"
                 )
         
         # Validate bot token format
-        token = self.get('bot.token')
+        token = self._bot_token
         if not token or token == "YOUR_BOT_TOKEN_HERE":
             raise ValueError(
                 "Invalid bot token. Please configure your bot token from @BotFather"
             )
         
         # Validate owner ID
-        owner_id = self.get('bot.owner_id')
+        owner_id = self._owner_id
         if not isinstance(owner_id, int) or owner_id <= 0:
             raise ValueError(
                 "Invalid owner_id. Please configure your Telegram user ID from @userinfobot"
             )
         
+        # Validate Bot API HTTP version
+        http_version = str(self.get('bot.http_version') or '1.1').strip()
+        if http_version not in _HTTP_VERSIONS:
+            raise ValueError(
+                f"Invalid bot.http_version: {http_version!r}. Use \"1.1\" or \"2\""
+            )
+        
         logger.info("Configuration validation passed")
     
     def get(self, key: str, default: Any = None) -> Any:
@@ -126,80 +373,38 @@ class Config:
         Returns:
             Configuration value (from env or YAML)
         """
-        # 环境变量映射（敏感信息和频道配置）
-        env_mapping = {
-            'bot.token': 'BOT_TOKEN',
-            'bot.owner_id': 'OWNER_ID',
-            'storage.telegram.channels.default': 'CHANNEL_DEFAULT',
-            'storage.telegram.channels.text': 'CHANNEL_TEXT',
-            'storage.telegram.channels.ebook': 'CHANNEL_EBOOK',
-            'storage.telegram.channels.document': 'CHANNEL_DOCUMENT',
-            'storage.telegram.channels.image': 'CHANNEL_IMAGE',
-            'storage.telegram.channels.media': 'CHANNEL_MEDIA',
-            'storage.telegram.channels.note': 'CHANNEL_NOTE',
-            'storage.telegram.direct_send.channels.default': 'CHANNEL_DIRECT_DEFAULT',
-            'ai.api.provider': 'AI_API_PROVIDER',
-            'ai.api.api_key': 'AI_API_KEY',
-            'ai.api.api_url': 'AI_API_URL',
-            'ai.api.model': 'AI_MODEL',
-            'ai.api.reasoning_model': 'AI_REASONING_MODEL',
-            'ai.exclude_from_context.channel_ids': 'AI_EXCLUDE_CHANNELS',
-            'ai.exclude_from_context.tags': 'AI_EXCLUDE_TAGS',
-            'bot.silent_sources': 'SILENT_SOURCES',
-        }
+        value = self._cache.get(key, _NOT_CACHED)
+        if value is _NOT_CACHED:
+            value = self._resolve(key)
+            self._cache[key] = value
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key: str) -> Any:
+        """
+        Resolve a key from environment variables or YAML config (uncached)
         
+        Args:
+            key: Dot-separated key path
+            
+        Returns:
+            Resolved value, or _MISSING if the key is not configured
+        """
         # 检查是否有对应的环境变量
-        env_var = env_mapping.get(key)
-        if env_var:
-            env_value = os.getenv(env_var)
-            if env_value is not None and env_value != '':
-                # 类型转换
-                if key == 'bot.owner_id':
-                    try:
-                        return int(env_value)
-                    except ValueError:
-                        logger.warning(f"Invalid {env_var} value: {env_value}, using YAML config")
-                elif key.startswith('storage.telegram.channels.') or key.startswith('storage.telegram.direct_send.channels.'):
-                    try:
-                        val = int(env_value)
-                        # 0表示未配置，返回None让系统使用默认逻辑
-                        return val if val != 0 else None
-                    except ValueError:
-                        logger.warning(f"Invalid {env_var} value: {env_value}, using YAML config")
-                elif key in ['ai.exclude_from_context.channel_ids', 'ai.exclude_from_context.tags', 'bot.silent_sources']:
-                    # 处理列表类型的环境变量（JSON格式或逗号分隔）
-                    try:
-                        import json
-                        # 优先尝试JSON格式
-                        return json.loads(env_value)
-                    except (json.JSONDecodeError, ValueError):
-                        # 降级为逗号分隔格式
-                        if ',' in env_value:
-                            items = [item.strip() for item in env_value.split(',') if item.strip()]
-                            # 尝试转换为整数（频道ID）
-                            result = []
-                            for item in items:
-                                try:
-                                    result.append(int(item))
-                                except ValueError:
-                                    result.append(item)  # 保留字符串（用户名）
-                            return result
-                        logger.warning(f"Invalid {env_var} value: {env_value}, using YAML config")
-                else:
-                    return env_value
+        value = _env_override(key)
+        if value is not _MISSING:
+            return value
         
         # 从 YAML 配置读取
-        keys = key.split('.')
         value = self._config
         
-        for k in keys:
+        for k in _split_path(key):
             if isinstance(value, dict):
                 value = value.get(k)
             else:
-                return default
+                return _MISSING
             
             if value is None:
-                return default
+                return _MISSING
         
         return value
     
@@ -215,7 +420,7 @@ class Config:
             True if successful, False otherwise
         """
         try:
-            keys = key.split('.')
+            keys = _split_path(key)
             config = self._config
             
             for k in keys[:-1]:
@@ -224,6 +429,8 @@ class Config:
                 config = config[k]
             
             config[keys[-1]] = value
+            self._cache.clear()
+            self._snapshot()
             return True
         except Exception as e:
             logger.error(f"Error setting config key {key}: {e}")
@@ -231,54 +438,74 @@ class Config:
     
     def save(self) -> None:
         """Save configuration to YAML file"""
+        tmp_path = None
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self._config, f, default_flow_style=False, allow_unicode=True)
+            # 先写临时文件并落盘，再原子替换，避免写入中途崩溃导致配置文件损坏
+            with tempfile.NamedTemporaryFile(
+                'w', dir=self.config_path.parent, prefix=f".{self.config_path.name}.",
+                suffix='.tmp', delete=False, encoding='utf-8'
+            ) as tmp:
+                tmp_path = tmp.name
+                yaml.dump(self._config, tmp, Dumper=_SafeDumper, default_flow_style=False, allow_unicode=True)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            # 保留原配置文件的权限位（临时文件默认为0600）
+            if self.config_path.exists():
+                os.chmod(tmp_path, self.config_path.stat().st_mode & 0o7777)
+            os.replace(tmp_path, self.config_path)
+            tmp_path = None
             
             logger.info(f"Configuration saved to {self.config_path}")
             
         except Exception as e:
             logger.error(f"Error saving config: {e}", exc_info=True)
             raise
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
     
     @property
     def bot_token(self) -> str:
         """Get bot token"""
-        return self.get('bot.token')
+        return self._bot_token
     
     @property
     def owner_id(self) -> int:
         """Get owner ID"""
-        return self.get('bot.owner_id')
+        return self._owner_id
     
     @property
     def language(self) -> str:
         """Get language setting"""
-        return self.get('bot.language', 'zh-CN')
+        return self._language
     
     @property
     def database_path(self) -> str:
         """Get database path"""
-        return self.get('storage.database.path', 'data/archive.db')
+        return self._database_path
+    
+    @property
+    def http_version(self) -> str:
+        """Get normalized Bot API HTTP version ('1.1' or '2')"""
+        return _HTTP_VERSIONS.get(str(self.get('bot.http_version') or '1.1').strip(), '1.1')
     
     @property
     def telegram_channel_id(self) -> Optional[int]:
         """Get Telegram channel ID (backward compatibility)"""
-        # 优先使用新配置
-        default_channel = self.get('storage.telegram.channels.default')
-        if default_channel and default_channel != 0:
-            return default_channel
-        
-        # 向后兼容：使用旧的channel_id
-        channel_id = self.get('storage.telegram.channel_id')
-        if channel_id and channel_id != 0:
-            return channel_id
-        return None
+        return self._telegram_channel_id
+    
+    @property
+    def telegram_channel_id_short(self) -> str:
+        """Get Telegram channel ID without the -100 prefix (for t.me/c/ links)"""
+        return self._telegram_channel_id_short
     
     @property
     def telegram_channels(self) -> Dict[str, int]:
         """Get all Telegram channel IDs"""
-        return self.get('storage.telegram.channels', {})
+        return self._telegram_channels
     
     @property
     def telegram_type_mapping(self) -> Dict[str, str]:
@@ -288,12 +515,22 @@ class Config:
     @property
     def telegram_storage_enabled(self) -> bool:
         """Check if Telegram storage is enabled"""
-        return self.get('storage.telegram.enabled', True) and self.telegram_channel_id is not None
+        return self.get('storage.telegram.enabled', True) and self._telegram_channel_id is not None
     
     @property
     def ai(self) -> Dict[str, Any]:
         """Get AI configuration"""
-        return self.get('ai', {})
+        return self._ai
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped on every load()/set(); lets derived caches detect config changes"""
+        return self._version
+    
+    @property
+    def ai_view(self) -> AiConfigView:
+        """Get AI configuration as a flattened read-only view"""
+        return self._ai_view
 
 
 # Global config instance
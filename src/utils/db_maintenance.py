@@ -1,20 +1,73 @@
 """
 Database backup and maintenance utilities
+
+Each function opens its own connection by default. To run several
+maintenance steps back-to-back on one connection, pass ``conn``:
+
+    with open_db(db_path) as conn:
+        verify_database(db_path, conn=conn)
+        optimize_database(db_path, conn=conn)
+        backup_database(db_path, conn=conn)
 """
 
-import shutil
 import logging
+import os
+import sqlite3
+from contextlib import closing, contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def open_db(db_path: str, *, readonly: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Open a maintenance connection with per-connection pragmas applied once
+    
+    Args:
+        db_path: Path to database file
+        readonly: Open via a read-only URI so nothing is written to the journal
+        
+    Yields:
+        Configured sqlite3 connection (closed on exit)
+    """
+    if readonly:
+        conn = sqlite3.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(str(db_path))
+    
+    try:
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _use_db(
+    db_path: str,
+    conn: Optional[sqlite3.Connection],
+    *,
+    readonly: bool = False
+) -> Iterator[sqlite3.Connection]:
+    """Yield the caller's connection as-is, or open (and close) a new one"""
+    if conn is not None:
+        yield conn
+    else:
+        with open_db(db_path, readonly=readonly) as own_conn:
+            yield own_conn
+
+
 def backup_database(
     db_path: str,
     backup_dir: Optional[str] = None,
-    keep_backups: int = 7
+    keep_backups: int = 7,
+    conn: Optional[sqlite3.Connection] = None
 ) -> Optional[str]:
     """
     Create a backup of the database
@@ -23,6 +76,7 @@ def backup_database(
         db_path: Path to database file
         backup_dir: Backup directory (default: data/backups)
         keep_backups: Number of backups to keep
+        conn: Open connection to db_path to reuse (optional)
         
     Returns:
         Path to backup file or None if failed
@@ -47,8 +101,13 @@ def backup_database(
         backup_name = f"{db_file.stem}_backup_{timestamp}{db_file.suffix}"
         backup_path = backup_dir / backup_name
         
-        # Copy database file
-        shutil.copy2(db_file, backup_path)
+        # Create backup using SQLite Online Backup API (consistent with an active WAL,
+        # unlike a raw file copy)
+        with _use_db(db_path, conn) as source_conn, closing(sqlite3.connect(str(backup_path))) as backup_conn:
+            # Fold the WAL into the main file first so the backup has less to copy
+            source_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            with backup_conn:
+                source_conn.backup(backup_conn, pages=1024)
         
         logger.info(f"Database backup created: {backup_path}")
         
@@ -71,48 +130,57 @@ def cleanup_old_backups(backup_dir: Path, keep_count: int) -> None:
         keep_count: Number of backups to keep
     """
     try:
-        # Get all backup files
-        backup_files = list(backup_dir.glob("*_backup_*.db"))
+        # Get all backup files ("*_backup_*.db"); DirEntry avoids Path wrappers
+        # and caches its stat() result
+        with os.scandir(backup_dir) as entries:
+            backup_files = [
+                entry for entry in entries
+                if '_backup_' in entry.name and entry.name.endswith('.db')
+                and entry.is_file(follow_symlinks=False)
+            ]
         
         if len(backup_files) <= keep_count:
             return
         
-        # Sort by modification time
-        backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        # Sort by modification time (newest first); names from different
+        # databases or manual copies do not sort chronologically
+        backup_files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
         
         # Remove old backups
         for old_backup in backup_files[keep_count:]:
             try:
-                old_backup.unlink()
+                os.unlink(old_backup.path)
                 logger.info(f"Removed old backup: {old_backup.name}")
             except Exception as e:
-                logger.warning(f"Failed to remove old backup {old_backup}: {e}")
+                logger.warning(f"Failed to remove old backup {old_backup.path}: {e}")
         
     except Exception as e:
         logger.error(f"Error cleaning old backups: {e}", exc_info=True)
 
 
-def verify_database(db_path: str) -> bool:
+def verify_database(
+    db_path: str,
+    deep: bool = False,
+    conn: Optional[sqlite3.Connection] = None
+) -> bool:
     """
     Verify database integrity
     
     Args:
         db_path: Path to database file
+        deep: Run the full integrity_check (also cross-checks indexes against
+            tables) instead of the much faster quick_check
+        conn: Open connection to db_path to reuse (optional)
         
     Returns:
         True if database is valid, False otherwise
     """
     try:
-        import sqlite3
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Run integrity check
-        cursor.execute("PRAGMA integrity_check")
-        result = cursor.fetchone()
-        
-        conn.close()
+        # Own connections are opened read-only so the check never writes to the journal
+        with _use_db(db_path, conn, readonly=True) as db:
+            # Run integrity check
+            cursor = db.execute("PRAGMA integrity_check" if deep else "PRAGMA quick_check")
+            result = cursor.fetchone()
         
         is_valid = result and result[0] == 'ok'
         
@@ -128,30 +196,33 @@ def verify_database(db_path: str) -> bool:
         return False
 
 
-def optimize_database(db_path: str) -> bool:
+def optimize_database(db_path: str, conn: Optional[sqlite3.Connection] = None) -> bool:
     """
     Optimize database (VACUUM and ANALYZE)
     
     Args:
         db_path: Path to database file
+        conn: Open connection to db_path to reuse (optional)
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        import sqlite3
-        
-        conn = sqlite3.connect(db_path)
-        
-        # Vacuum to reclaim space
-        logger.info("Running VACUUM...")
-        conn.execute("VACUUM")
-        
-        # Analyze to update statistics
-        logger.info("Running ANALYZE...")
-        conn.execute("ANALYZE")
-        
-        conn.close()
+        with _use_db(db_path, conn) as db:
+            # WAL is persistent in the database file; the connection pragmas set
+            # by open_db speed up the VACUUM/ANALYZE below
+            db.execute("PRAGMA journal_mode=WAL")
+            
+            # Vacuum to reclaim space
+            logger.info("Running VACUUM...")
+            db.execute("VACUUM")
+            
+            # Analyze to update statistics
+            logger.info("Running ANALYZE...")
+            db.execute("ANALYZE")
+            
+            # Let SQLite refresh any remaining planner statistics
+            db.execute("PRAGMA optimize")
         
         logger.info("Database optimization completed")
         return True
@@ -1,14 +1,33 @@
 """
 消息格式化器模块
 按功能类型拆分的格式化器集合
+
+格式化器按需懒加载（PEP 562），导入其中一个子模块不会连带加载其余格式化器
 """
 
-from .archive_formatter import ArchiveFormatter
-from .note_formatter import NoteFormatter
-from .system_formatter import SystemFormatter
+import importlib
+
+_LAZY = {
+    'ArchiveFormatter': '.archive_formatter',
+    'NoteFormatter': '.note_formatter',
+    'SystemFormatter': '.system_formatter',
+}
 
 __all__ = [
     'ArchiveFormatter',
     'NoteFormatter',
     'SystemFormatter',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
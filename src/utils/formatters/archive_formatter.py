@@ -4,17 +4,150 @@
 """
 from __future__ import annotations
 
-import html
+import asyncio
+import functools
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from telegram import Bot, Message, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 
-from ..helpers import truncate_text, get_content_type_emoji, format_file_size, format_datetime
+from ..helpers import truncate_text, get_content_type_emoji, format_file_size, format_datetime, escape_html, build_tg_link
 from ..config import get_config
 
 logger = logging.getLogger(__name__)
 
+# HTML标签匹配（用于从内容中提取纯文本标题）
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# 来源信息前缀（转发来源显示时去掉）
+_SOURCE_PREFIX_RE = re.compile(r'^(?:转发自:|Forwarded from:|转发自用户:)\s*')
+
+# 读取配置时的只读默认值（共享常量，避免每次缺省都新建容器）
+_EMPTY_DICT: Dict[str, Any] = {}
+_EMPTY_LIST: tuple = ()
+
+# 内容中来源信息与正文之间的分隔符
+_SOURCE_SEP = '--------------------'
+
+# 频道名称缓存：channel_id -> (写入时间, 频道名称)，缓存未配置频道的 Bot API 查询结果
+_CHANNEL_NAME_TTL = 3600
+_channel_name_cache: Dict[int, tuple[float, str]] = {}
+# 进行中的 get_chat 请求：channel_id -> Future（合并同一频道的并发查询）
+_channel_name_inflight: Dict[int, asyncio.Future] = {}
+
+# content_type -> (Bot发送方法名, 文件参数名)；photo 在 analyzer 中被标记为 'image'
+_SEND_DISPATCH = {
+    'image': ('send_photo', 'photo'),
+    'video': ('send_video', 'video'),
+    'audio': ('send_audio', 'audio'),
+    'voice': ('send_voice', 'voice'),
+    'animation': ('send_animation', 'animation'),  # GIF
+    'sticker': ('send_sticker', 'sticker'),
+    'document': ('send_document', 'document'),
+    'ebook': ('send_document', 'document'),
+}
+
+# 从config构建的 频道ID -> 频道名称 映射表：(配置版本, 映射表)，懒加载，配置版本变化时重建
+_reverse_channel_map: Optional[Tuple[int, Dict[Any, str]]] = None
+
+
+def _get_reverse_channel_map() -> Dict[Any, str]:
+    """
+    获取 频道ID -> 频道名称 的映射表（首次调用时从config构建，配置未变化时复用）
+    
+    Returns:
+        频道ID到名称的映射
+    """
+    global _reverse_channel_map
+    config = get_config()
+    version = config.version
+    if _reverse_channel_map is not None and _reverse_channel_map[0] == version:
+        return _reverse_channel_map[1]
+    
+    # 配置已变化（或首次构建）：按名称缓存的查询结果一并作废
+    _channel_name_cache.clear()
+    
+    channels_config = config.get('storage.telegram.channels', _EMPTY_DICT)
+    source_mapping = config.get('storage.telegram.source_mapping', _EMPTY_LIST)
+    direct_send_config = config.get('storage.telegram.direct_send', _EMPTY_DICT)
+    
+    # 创建ID到名称的映射表
+    channel_names = {
+        channels_config.get('default'): '默认频道',
+        channels_config.get('text'): '文本频道',
+        channels_config.get('image'): '图片频道',
+        channels_config.get('video'): '视频频道',
+        channels_config.get('document'): '文档频道',
+        channels_config.get('ebook'): '电子书频道',
+        channels_config.get('media'): '媒体频道',
+        channels_config.get('note'): '笔记频道',
+    }
+    
+    # 从direct_send配置添加
+    if direct_send_config and direct_send_config.get('channels'):
+        ds_channels = direct_send_config['channels']
+        channel_names[ds_channels.get('default')] = '私人频道'
+    
+    # 从source_mapping添加
+    for mapping in source_mapping or []:
+        ch_id = mapping.get('channel_id')
+        if ch_id and mapping.get('sources'):
+            channel_names[ch_id] = '转发频道'
+    
+    _reverse_channel_map = (version, channel_names)
+    return channel_names
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_storage(storage_path: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    解析 storage_path（两次 str.partition，不生成中间列表；按字符串缓存）
+    
+    Args:
+        storage_path: 格式如 "channel_id:message_id" 或 "channel_id:message_id:file_id"
+        
+    Returns:
+        (channel_id, message_id, file_id)，缺少的段为None
+    """
+    channel_id, sep, rest = storage_path.partition(':')
+    if not sep:
+        return channel_id, None, None
+    message_id, sep, file_id = rest.partition(':')
+    return channel_id, message_id, (file_id if sep else None)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_points_json(raw: str) -> tuple:
+    """解析JSON格式的关键点字符串（按原字符串缓存，列表重复渲染时不再重复解析）"""
+    try:
+        value = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        logger.debug(f"Invalid ai_key_points JSON: {e}")
+        return ()
+    return tuple(value) if isinstance(value, list) else ()
+
+
+def _coerce_points(value: Any) -> List[Any]:
+    """
+    将 ai_key_points 规范化为列表（数据库中可能是JSON字符串或已解析的列表）
+    
+    Args:
+        value: 原始 ai_key_points 值
+        
+    Returns:
+        关键点列表，无效时返回空列表
+    """
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return list(_parse_points_json(value))
+    return []
+
 
 async def _get_channel_name_from_path(storage_path: str, bot: Optional[Any] = None) -> Optional[str]:
     """
@@ -32,58 +165,41 @@ async def _get_channel_name_from_path(storage_path: str, bot: Optional[Any] = No
     
     try:
         # 解析channel_id
-        parts = storage_path.split(':')
-        channel_id = int(parts[0])
+        channel_id = int(_parse_storage(storage_path)[0])
+        
+        # 已在config中配置的频道直接使用映射表，无需请求Bot API
+        channel_name = _get_reverse_channel_map().get(channel_id)
+        if channel_name:
+            return channel_name
+        
+        # 其次使用Bot API结果缓存（TTL内有效）
+        cached = _channel_name_cache.get(channel_id)
+        if cached and time.monotonic() - cached[0] < _CHANNEL_NAME_TTL:
+            return cached[1]
         
-        # 尝试从Telegram Bot API获取频道信息
+        # 未配置的频道才从Telegram Bot API获取频道信息
         if bot:
+            # 同一频道已有进行中的请求时直接等待其结果，避免并发重复请求
+            inflight = _channel_name_inflight.get(channel_id)
+            if inflight is not None:
+                return await asyncio.shield(inflight)
+            
+            future = asyncio.get_running_loop().create_future()
+            _channel_name_inflight[channel_id] = future
+            title = None
             try:
                 chat = await bot.get_chat(channel_id)
                 if chat.title:
-                    return chat.title
+                    title = chat.title
+                    _channel_name_cache[channel_id] = (time.monotonic(), title)
             except Exception as e:
                 logger.debug(f"Failed to get chat info from Bot API: {e}")
-        
-        # 如果Bot API获取失败，从config读取映射
-        from ..config import get_config
-        config = get_config()
-        
-        channels_config = config.get('storage.telegram.channels', {})
-        type_mapping = config.get('storage.telegram.type_mapping', {})
-        source_mapping = config.get('storage.telegram.source_mapping', [])
-        tag_mapping = config.get('storage.telegram.tag_mapping', [])
-        direct_send_config = config.get('storage.telegram.direct_send', {})
-        
-        # 创建ID到名称的映射表
-        channel_names = {
-            channels_config.get('default'): '默认频道',
-            channels_config.get('text'): '文本频道',
-            channels_config.get('image'): '图片频道',
-            channels_config.get('video'): '视频频道',  
-            channels_config.get('document'): '文档频道',
-            channels_config.get('ebook'): '电子书频道',
-            channels_config.get('media'): '媒体频道',
-            channels_config.get('note'): '笔记频道',
-        }
-        
-        # 从direct_send配置添加
-        if direct_send_config and direct_send_config.get('channels'):
-            ds_channels = direct_send_config['channels']
-            channel_names[ds_channels.get('default')] = '私人频道'
-        
-        # 从source_mapping添加
-        for mapping in source_mapping or []:
-            ch_id = mapping.get('channel_id')
-            if ch_id:
-                # 使用第一个来源作为名称提示
-                sources = mapping.get('sources', [])
-                if sources:
-                    channel_names[ch_id] = f'转发频道'
-        
-        # 查找匹配的频道名
-        channel_name = channel_names.get(channel_id)
-        if channel_name:
-            return channel_name
+            finally:
+                _channel_name_inflight.pop(channel_id, None)
+                if not future.done():
+                    future.set_result(title)
+            
+            return title
         
         # 如果没找到，返回None让调用方处理
         return None
@@ -119,7 +235,7 @@ class ArchiveFormatter:
         emoji = get_content_type_emoji(content_type)
         
         # ========== 顶部：成功状态 ==========
-        success_msg = f"<b>{i18n.t('archive_success')}</b>"
+        msg_parts = [f"<b>{i18n.t('archive_success')}</b>"]
         
         # ========== 标题：带存储位置跳转链接 ==========
         # 优先级：AI生成标题 > 内容截断(45字符，第一段) > 原标题 > 文件名 > 类型名
@@ -138,16 +254,17 @@ class ArchiveFormatter:
             text_source = content or caption
             
             # 如果content包含来源分隔符，提取实际内容部分
-            if text_source and '--------------------' in text_source:
+            if text_source and _SOURCE_SEP in text_source:
                 # 跳过来源信息行，提取实际内容
-                parts = text_source.split('--------------------', 1)
+                parts = text_source.split(_SOURCE_SEP, 1)
                 if len(parts) > 1:
                     text_source = parts[1].strip()
             
-            # 提取第一段（去除HTML标签）
-            import re
-            # 移除HTML标签
-            text_source_plain = re.sub(r'<[^>]+>', '', text_source)
+            # 提取第一段（去除HTML标签；纯文本不含 '<' 时跳过正则）
+            if '<' in text_source:
+                text_source_plain = _HTML_TAG_RE.sub('', text_source)
+            else:
+                text_source_plain = text_source
             first_para = text_source_plain.split('\n')[0].strip()
             if len(first_para) > 45:
                 title_text = first_para[:45] + '...'
@@ -168,18 +285,15 @@ class ArchiveFormatter:
         # 构建存储位置链接（需要转义title_text以防止HTML注入）
         storage_path = archive_data.get('storage_path')
         if storage_path and isinstance(storage_path, str) and ':' in storage_path:
-            parts = storage_path.split(':')
-            if len(parts) >= 2:
-                channel_id_str = parts[0].replace('-100', '')
-                message_id = parts[1]
-                storage_link = f"https://t.me/c/{channel_id_str}/{message_id}"
-                title_display = f'📄 <a href="{storage_link}">{html.escape(title_text)}</a>'
+            storage_link = build_tg_link(storage_path)
+            if storage_link:
+                title_display = f'📄 <a href="{storage_link}">{escape_html(title_text)}</a>'
             else:
-                title_display = f'{emoji} {html.escape(title_text)}'
+                title_display = f'{emoji} {escape_html(title_text)}'
         else:
-            title_display = f'{emoji} {html.escape(title_text)}'
+            title_display = f'{emoji} {escape_html(title_text)}'
         
-        success_msg += f"\n\n{title_display}"
+        msg_parts.append(f"\n\n{title_display}")
         
         # ========== 基本信息区（紧凑显示） ==========
         info_parts = []
@@ -197,21 +311,21 @@ class ArchiveFormatter:
             info_parts.append(f"💾 {format_file_size(file_size)}")
         
         if info_parts:
-            success_msg += f"\n<code>{' · '.join(info_parts)}</code>"
+            msg_parts.append(f"\n<code>{' · '.join(info_parts)}</code>")
         
         # ========== 标签（换行独立显示） ==========
         tags = archive_data.get('tags', [])
         if tags:
-            tags_str = ' '.join(f"#{tag}" for tag in tags[:6])
+            tags_str = ' '.join([f"#{tag}" for tag in tags[:6]])
             if len(tags) > 6:
                 tags_str += f" <i>+{len(tags) - 6}</i>"
-            success_msg += f"\n🏷 {tags_str}"
+            msg_parts.append(f"\n🏷 {tags_str}")
         
         # ========== 存储位置（简化显示） ==========
         if storage_path:
             channel_name = await _get_channel_name_from_path(storage_path, bot)
             if channel_name:
-                success_msg += f"\n📁 {channel_name}"
+                msg_parts.append(f"\n📁 {channel_name}")
         
         # ========== 来源信息（使用HTML链接） ==========
         source = archive_data.get('source')
@@ -223,16 +337,13 @@ class ArchiveFormatter:
                 if len(source_parts) > 0:
                     main_source = source_parts[0].strip()
                     # 去掉前缀
-                    for prefix in ['转发自:', 'Forwarded from:', '转发自用户:']:
-                        if main_source.startswith(prefix):
-                            main_source = main_source[len(prefix):].strip()
-                            break
+                    main_source = _SOURCE_PREFIX_RE.sub('', main_source, count=1)
                     
                     # 构建显示文本（纯文本，不使用链接）
-                    success_msg += f"\n🔗 来源 {html.escape(main_source)}"
+                    msg_parts.append(f"\n🔗 来源 {escape_html(main_source)}")
             else:
                 # 如果没有特定格式，直接显示（转义用户输入）
-                success_msg += f"\n🔗 <i>{html.escape(source)}</i>"
+                msg_parts.append(f"\n🔗 <i>{escape_html(source)}</i>")
         
         # ========== AI分析信息（分隔显示） ==========
         if include_ai_info:
@@ -240,25 +351,26 @@ class ArchiveFormatter:
             ai_category = archive_data.get('ai_category')
             ai_key_points = archive_data.get('ai_key_points', [])
             
-            logger.debug(f"AI info check: include={include_ai_info}, summary={bool(ai_summary)}, category={bool(ai_category)}, points={len(ai_key_points)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"AI info check: include={include_ai_info}, summary={bool(ai_summary)}, category={bool(ai_category)}, points={len(ai_key_points)}")
             
             if ai_summary or ai_category or ai_key_points:
-                success_msg += f"\n\n{'─' * 25}"
-                success_msg += f"\n<b>{i18n.t('ai_analysis')}</b>"
+                msg_parts.append(f"\n\n{'─' * 25}")
+                msg_parts.append(f"\n<b>{i18n.t('ai_analysis')}</b>")
                 
                 if ai_category:
-                    success_msg += f"\n📚 {ai_category}"
+                    msg_parts.append(f"\n📚 {ai_category}")
                 
                 if ai_summary:
                     summary_text = truncate_text(ai_summary, 180)
-                    success_msg += f"\n\n💭 {summary_text}"
+                    msg_parts.append(f"\n\n💭 {summary_text}")
                 
                 if ai_key_points:
-                    success_msg += f"\n\n<b>{i18n.t('ai_key_points')}</b>"
+                    msg_parts.append(f"\n\n<b>{i18n.t('ai_key_points')}</b>")
                     for i, point in enumerate(ai_key_points[:3], 1):
-                        success_msg += f"\n  • {point}"
+                        msg_parts.append(f"\n  • {point}")
         
-        return success_msg
+        return "".join(msg_parts)
     
     @staticmethod
     def format_list(
@@ -282,28 +394,30 @@ class ArchiveFormatter:
         if not archives:
             return i18n.t('search_no_results', keyword='')
         
-        # Group archives by media_group_id
-        media_groups = {}  # media_group_id -> list of archives
+        # Group archives by media_group_id in a single pass: keep only the
+        # representative (lowest archive_id = first message) and a member count
+        media_groups = {}  # media_group_id -> [first archive, count]
         standalone_archives = []  # archives without media_group_id
         
         for archive in archives:
             media_group_id = archive.get('media_group_id')
             if media_group_id:
-                if media_group_id not in media_groups:
-                    media_groups[media_group_id] = []
-                media_groups[media_group_id].append(archive)
+                group = media_groups.get(media_group_id)
+                if group is None:
+                    media_groups[media_group_id] = [archive, 1]
+                else:
+                    if archive.get('id', 0) < group[0].get('id', 0):
+                        group[0] = archive
+                    group[1] += 1
             else:
                 standalone_archives.append(archive)
         
         # Build flattened list: use first archive from each media group
         display_archives = []
-        for media_group_id, group_archives in media_groups.items():
-            # Sort by archive_id to get the first message in the group
-            group_archives.sort(key=lambda x: x.get('id', 0))
-            first_archive = group_archives[0]
+        for first_archive, group_count in media_groups.values():
             # Mark as media group and store count
             first_archive['_is_media_group'] = True
-            first_archive['_media_group_count'] = len(group_archives)
+            first_archive['_media_group_count'] = group_count
             display_archives.append(first_archive)
         
         # Add standalone archives
@@ -312,6 +426,14 @@ class ArchiveFormatter:
         # Sort by original order (archived_at)
         display_archives.sort(key=lambda x: x.get('archived_at', ''), reverse=True)
         
+        # 一次性批量查询精选/笔记状态，避免每条归档两次数据库查询
+        if db_instance:
+            archive_ids = [archive.get('id') for archive in display_archives]
+            favorite_ids = db_instance.is_favorite_bulk(archive_ids)
+            noted_ids = db_instance.has_notes_bulk(archive_ids)
+        else:
+            favorite_ids = noted_ids = frozenset()
+        
         formatted_results = []
         
         for idx, archive in enumerate(display_archives, 1):
@@ -323,19 +445,14 @@ class ArchiveFormatter:
             media_group_count = archive.get('_media_group_count', 0)
             
             # Get title (priority: ai_title > title > content preview)
-            title = archive.get('ai_title') or archive.get('title')
-            if not title:
-                content = archive.get('content', '')
-                if content:
-                    title = truncate_text(content, 50)
-                else:
-                    title = 'Untitled'
+            title = archive.get('ai_title') or archive.get('title') or archive.get('content') or 'Untitled'
             
-            # For media groups, append count indicator
+            # For media groups, append count indicator (reserve room so truncation keeps it)
             if is_media_group and media_group_count > 1:
-                title = f"{title} ({media_group_count} items)"
-            
-            title_truncated = truncate_text(title, 50)
+                count_suffix = f" ({media_group_count} items)"
+                title_truncated = truncate_text(title, 50 - len(count_suffix)) + count_suffix
+            else:
+                title_truncated = truncate_text(title, 50)
             
             storage_path = archive.get('storage_path')
             storage_type = archive.get('storage_type')
@@ -344,34 +461,22 @@ class ArchiveFormatter:
             if with_links and storage_path and storage_type == 'telegram':
                 try:
                     # Parse storage_path format: "channel_id:message_id" or "channel_id:message_id:file_id"
-                    parts = storage_path.split(':')
-                    if len(parts) >= 2:
-                        channel_id = parts[0]
-                        message_id = parts[1]
-                        
-                        # Convert channel_id to short format for t.me/c/ links
-                        # Remove -100 prefix if present
-                        if channel_id.startswith('-100'):
-                            channel_id_short = channel_id[4:]  # Remove '-100'
-                        else:
-                            channel_id_short = channel_id.lstrip('-')
-                        
-                        link = f"https://t.me/c/{channel_id_short}/{message_id}"
+                    link = build_tg_link(storage_path)
+                    if link:
                         # HTML转义标题文本
-                        import html
-                        title_escaped = html.escape(title_truncated)
+                        title_escaped = escape_html(title_truncated)
                         title_truncated = f"<a href='{link}'>{title_escaped}</a>"
                 except Exception as e:
                     logger.debug(f"Failed to build link for archive {archive_id}: {e}")
             
             # Get tags
             tags = archive.get('tags', [])
-            tags_str = ' '.join(f"#{tag}" for tag in tags) if tags else ''
+            tags_str = ' '.join([f"#{tag}" for tag in tags]) if tags else ''
             
             archived_at = archive.get('archived_at', '')
             
-            is_favorite = db_instance.is_favorite(archive_id) if db_instance else False
-            has_notes = db_instance.has_notes(archive_id) if db_instance else False
+            is_favorite = archive_id in favorite_ids
+            has_notes = archive_id in noted_ids
             
             fav_icon = "❤️ 已精选" if is_favorite else "🤍 未精选"
             note_icon = "📝 √ 有笔记" if has_notes else "📝 无笔记"
@@ -418,11 +523,8 @@ class ArchiveFormatter:
         
         archive_link = ''
         if storage_path:
-            parts = storage_path.split(':')
-            if len(parts) >= 2:
-                channel_id_str = parts[0].replace('-100', '')
-                message_id = parts[1]
-                link = f"https://t.me/c/{channel_id_str}/{message_id}"
+            link = build_tg_link(storage_path)
+            if link:
                 archive_link = f"<a href='{link}'>#{archive_id}</a>"
             else:
                 archive_link = f"#{archive_id}"
@@ -435,23 +537,23 @@ class ArchiveFormatter:
         elif db_instance:
             has_notes = db_instance.has_notes(archive_id)
         
-        if title:
-            text = f"📝 [文本 {archive_link}] {title}\n"
-        else:
-            text = f"📝 [文本 {archive_link}]\n"
-        
-        text += "----------------------------------\n"
-        text += f"{truncate_text(content, 500)}\n"
-        text += "----------------------------------\n"
-        text += f"📅 {created_at}\n"
+        text_parts = [
+            f"📝 [文本 {archive_link}] {title}\n" if title else f"📝 [文本 {archive_link}]\n",
+            "----------------------------------\n",
+            f"{truncate_text(content, 500)}\n",
+            "----------------------------------\n",
+            f"📅 {created_at}\n",
+        ]
         
         if has_notes and notes:
-            text += "\n💬 关联笔记：\n"
+            text_parts.append("\n💬 关联笔记：\n")
             for note in notes[:2]:
                 note_preview = truncate_text(note.get('content', ''), 100)
-                text += f"  • {note_preview}\n"
+                text_parts.append(f"  • {note_preview}\n")
             if len(notes) > 2:
-                text += f"  ...还有 {len(notes) - 2} 条笔记\n"
+                text_parts.append(f"  ...还有 {len(notes) - 2} 条笔记\n")
+        
+        text = "".join(text_parts)
         
         keyboard = []
         if has_notes:
@@ -508,19 +610,10 @@ class ArchiveFormatter:
             caption_parts.append(f"📝 {ai_summary}")
         
         # 添加AI关键点
-        if ai_key_points:
-            try:
-                import json
-                if isinstance(ai_key_points, str):
-                    key_points = json.loads(ai_key_points)
-                else:
-                    key_points = ai_key_points
-                
-                if key_points and isinstance(key_points, list):
-                    points_text = "\n".join([f"• {point}" for point in key_points[:5]])  # 最多5个关键点
-                    caption_parts.append(f"🔑 关键点:\n{points_text}")
-            except:
-                pass
+        key_points = _coerce_points(ai_key_points)
+        if key_points:
+            points_text = "\n".join([f"• {point}" for point in key_points[:5]])  # 最多5个关键点
+            caption_parts.append(f"🔑 关键点:\n{points_text}")
         
         # 添加AI分类
         if ai_category and ai_category.strip():
@@ -564,8 +657,7 @@ class ArchiveFormatter:
         
         row1 = []
         if storage_path:
-            parts = storage_path.split(':')
-            if len(parts) >= 2:
+            if _parse_storage(storage_path)[1] is not None:
                 row1.append(InlineKeyboardButton("🔗 查看", callback_data=f"view_channel:{archive_id}"))
         
         if has_notes:
@@ -604,16 +696,13 @@ class ArchiveFormatter:
         emoji = get_content_type_emoji(content_type)
         
         if storage_path:
-            parts = storage_path.split(':')
-            if len(parts) >= 2:
-                channel_id_str = parts[0].replace('-100', '')
-                message_id = parts[1]
-                link = f"https://t.me/c/{channel_id_str}/{message_id}"
-                text = f"{emoji} <a href='{link}'>{html.escape(title)}</a>\n"
+            link = build_tg_link(storage_path)
+            if link:
+                text = f"{emoji} <a href='{link}'>{escape_html(title)}</a>\n"
             else:
-                text = f"{emoji} {html.escape(title)}\n"
+                text = f"{emoji} {escape_html(title)}\n"
         else:
-            text = f"{emoji} {html.escape(title)}\n"
+            text = f"{emoji} {escape_html(title)}\n"
         
         text += "----------------------------------"
         
@@ -664,18 +753,13 @@ class ArchiveFormatter:
                 logger.warning(f"Cannot send resource: storage_type={storage_type}, storage_path={storage_path}")
                 return None
             
-            parts = storage_path.split(':')
-            file_id = None
+            channel_id, message_id, file_id = _parse_storage(storage_path)
             
-            if len(parts) >= 3:
-                file_id = parts[2]
-            elif len(parts) == 2:
-                if parts[0].startswith('-'):
-                    file_id = archive.get('file_id')
+            if file_id is None:
+                if message_id is not None and not channel_id.startswith('-'):
+                    file_id = message_id
                 else:
-                    file_id = parts[1]
-            else:
-                file_id = archive.get('file_id')
+                    file_id = archive.get('file_id')
             
             if not file_id:
                 logger.warning(f"No file_id found for archive {archive.get('id')}")
@@ -686,25 +770,18 @@ class ArchiveFormatter:
             
             # 根据准确的 content_type 发送对应类型的消息
             # content_type 来自 analyzer.py，确保类型匹配
-            if content_type == 'image':  # photo 在 analyzer 中被标记为 'image'
-                return await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption, reply_markup=reply_markup)
-            elif content_type == 'video':
-                return await bot.send_video(chat_id=chat_id, video=file_id, caption=caption, reply_markup=reply_markup)
-            elif content_type == 'audio':
-                return await bot.send_audio(chat_id=chat_id, audio=file_id, caption=caption, reply_markup=reply_markup)
-            elif content_type == 'voice':
-                return await bot.send_voice(chat_id=chat_id, voice=file_id, caption=caption, reply_markup=reply_markup)
-            elif content_type == 'animation':  # GIF
-                return await bot.send_animation(chat_id=chat_id, animation=file_id, caption=caption, reply_markup=reply_markup)
-            elif content_type == 'sticker':
-                return await bot.send_sticker(chat_id=chat_id, sticker=file_id, reply_markup=reply_markup)
-            elif content_type in ['document', 'ebook']:
-                return await bot.send_document(chat_id=chat_id, document=file_id, caption=caption, reply_markup=reply_markup)
-            else:
+            entry = _SEND_DISPATCH.get(content_type)
+            if entry is None:
                 # 对于 text, link, contact, location, unknown 等类型不应该调用此方法
                 # 如果到这里说明数据有问题，记录警告
                 logger.warning(f"Unexpected content_type '{content_type}' in send_resource, cannot send")
                 return None
+            
+            method_name, file_param = entry
+            kwargs = {'chat_id': chat_id, file_param: file_id, 'reply_markup': reply_markup}
+            if method_name != 'send_sticker':  # 贴纸不支持caption
+                kwargs['caption'] = caption
+            return await getattr(bot, method_name)(**kwargs)
         
         except Exception as e:
             logger.error(f"Failed to send archive resource: {e}", exc_info=True)
@@ -729,6 +806,7 @@ class ArchiveFormatter:
         Returns:
             成功发送的数量
         """
+        # 逐个顺序发送：保持用户请求的资源顺序，也避免同一会话的突发请求触发Telegram频率限制
         sent_count = 0
         
         for archive in archives[:max_count]:
@@ -4,13 +4,270 @@
 """
 from __future__ import annotations
 
+import functools
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from ...ai.summarizer import get_ai_summarizer
+from ..config import AiConfigView
+from ..helpers import format_file_size
+from ..i18n import I18n
+from .note_formatter import format_ai_summary as _format_notes_summary
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _i18n(language: str) -> I18n:
+    """按语言复用 I18n 实例（构造时会加载全部翻译文件；此处只读使用）"""
+    return I18n(language)
+
+
+# 内容类型对应的图标（统计信息中使用）
+_TYPE_EMOJI = {
+    'text': '📝',
+    'link': '🔗',
+    'image': '🖼️',
+    'video': '🎬',
+    'audio': '🎵',
+    'voice': '🎤',
+    'document': '📄',
+    'ebook': '📚',
+    'animation': '🎞️',
+    'sticker': '🎭',
+    'contact': '👤',
+    'location': '📍'
+}
+
+# AI对话上下文摘要的各语言文案（未知语言回退到简体中文）
+_AI_CONTEXT_MSGS = {
+    'en': {
+        'stats_brief': "📊 System Statistics:\n• Total Archives: {total_archives}\n• Total Tags: {total_tags}\n• Storage Used: {total_size}\n",
+        'stats_has_data': "✅ User has {total_archives} archived items",
+        'search_empty': "🔍 No results found for '{query}'",
+        'search_header': "🔍 Found {total_count} result(s) for '{query}':\n\n",
+        'search_more': "\n... and {remaining} more",
+        'no_title': "No title",
+        'tags_empty': "No tags available",
+        'tags_header': "🏷️ Top {count} Tags:\n",
+        'recent_empty': "No recent archives",
+        'no_data': "No relevant data available",
+        'recent_header': "📚 Recent {count} Archives:\n",
+    },
+    'zh-TW': {
+        'stats_brief': "📊 系統統計：\n• 歸檔總數：{total_archives}\n• 標籤總數：{total_tags}\n• 存儲使用：{total_size}\n",
+        'stats_has_data': "✅ 用戶已有 {total_archives} 條歸檔記錄",
+        'search_empty': "🔍 沒有找到關於「{query}」的結果",
+        'search_header': "🔍 找到 {total_count} 個關於「{query}」的結果：\n\n",
+        'search_more': "\n...還有 {remaining} 個",
+        'no_title': "無標題",
+        'tags_empty': "暫無標籤",
+        'tags_header': "🏷️ 熱門標籤 TOP {count}：\n",
+        'recent_empty': "暫無最近歸檔",
+        'no_data': "暫無相關數據",
+        'recent_header': "📚 最近 {count} 條歸檔：\n",
+    },
+    'zh-CN': {
+        'stats_brief': "📊 系统统计：\n• 归档总数：{total_archives}\n• 标签总数：{total_tags}\n• 存储使用：{total_size}\n",
+        'stats_has_data': "✅ 用户已有 {total_archives} 条归档记录",
+        'search_empty': "🔍 没有找到关于「{query}」的结果",
+        'search_header': "🔍 找到 {total_count} 个关于「{query}」的结果：\n\n",
+        'search_more': "\n...还有 {remaining} 个",
+        'no_title': "无标题",
+        'tags_empty': "暂无标签",
+        'tags_header': "🏷️ 热门标签 TOP {count}：\n",
+        'recent_empty': "暂无最近归档",
+        'no_data': "暂无相关数据",
+        'recent_header': "📚 最近 {count} 条归档：\n",
+    },
+}
+
+
+def _setting_value_display(item_type: str, value: Any) -> str:
+    """配置菜单按钮中显示的当前值"""
+    if item_type == 'bool':
+        return "✅" if value else "❌"
+    if item_type == 'float':
+        return f"{value:.2f}" if value is not None else "未设置"
+    if item_type == 'choice':
+        return str(value) if value else "未设置"
+    return str(value) if value is not None else "未设置"
+
+
+def _prompt_bool(item_info: Dict[str, Any], config_key: str, current_value: Any, category_key: str) -> Tuple[str, list]:
+    """布尔类型：显示状态和切换按钮"""
+    status_text = "✅ 已启用" if current_value else "❌ 已禁用"
+    text = f"当前状态：{status_text}\n"
+    
+    # 根据当前状态显示相反的操作按钮
+    btn_text, btn_value = ("❌ 禁用", "false") if current_value else ("✅ 启用", "true")
+    keyboard = [
+        [InlineKeyboardButton(btn_text, callback_data=f"setting_set:{config_key}:{btn_value}")],
+        [InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")]
+    ]
+    
+    return text, keyboard
+
+
+def _prompt_int(item_info: Dict[str, Any], config_key: str, current_value: Any, category_key: str) -> Tuple[str, list]:
+    """整数类型：显示取值范围，等待用户回复"""
+    text = f"当前值：<code>{current_value}</code>\n\n"
+    
+    min_val = item_info.get('min')
+    max_val = item_info.get('max')
+    default_val = item_info.get('default')
+    
+    text += "请输入新值（整数）：\n"
+    if min_val is not None:
+        text += f"• 最小值：{min_val}\n"
+    if max_val is not None:
+        text += f"• 最大值：{max_val}\n"
+    if default_val is not None:
+        text += f"• 默认值：{default_val}\n"
+    
+    text += f"\n💡 直接回复数字即可"
+    
+    keyboard = [[
+        InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
+    ]]
+    return text, keyboard
+
+
+def _prompt_string(item_info: Dict[str, Any], config_key: str, current_value: Any, category_key: str) -> Tuple[str, list]:
+    """文本类型：显示示例，等待用户回复"""
+    text = f"当前值：<code>{current_value}</code>\n\n"
+    
+    example = item_info.get('example', '')
+    
+    text += "请输入新值（文本）：\n"
+    if example:
+        text += f"• 示例：<code>{example}</code>\n"
+    
+    text += f"\n💡 直接回复文本即可"
+    
+    keyboard = [[
+        InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
+    ]]
+    return text, keyboard
+
+
+def _prompt_float(item_info: Dict[str, Any], config_key: str, current_value: Any, category_key: str) -> Tuple[str, list]:
+    """小数类型：显示取值范围和步进，等待用户回复"""
+    text = f"当前值：<code>{current_value}</code>\n\n"
+    
+    min_val = item_info.get('min')
+    max_val = item_info.get('max')
+    default_val = item_info.get('default')
+    step = item_info.get('step', 0.1)
+    
+    text += "请输入新值（小数）：\n"
+    if min_val is not None:
+        text += f"• 最小值：{min_val}\n"
+    if max_val is not None:
+        text += f"• 最大值：{max_val}\n"
+    if default_val is not None:
+        text += f"• 默认值：{default_val}\n"
+    if step:
+        text += f"• 步进：{step}\n"
+    
+    text += f"\n💡 直接回复数字即可"
+    
+    keyboard = [[
+        InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
+    ]]
+    return text, keyboard
+
+
+def _prompt_choice(item_info: Dict[str, Any], config_key: str, current_value: Any, category_key: str) -> Tuple[str, list]:
+    """选项类型：列出可选值并为每个选项生成按钮"""
+    text = f"当前值：<code>{current_value}</code>\n\n"
+    choices = item_info.get('choices', [])
+    default_val = item_info.get('default')
+    
+    text += "请选择新值：\n"
+    for choice in choices:
+        marker = "• " if choice != current_value else "✓ "
+        text += f"{marker}{choice}\n"
+    if default_val:
+        text += f"\n默认值：{default_val}\n"
+    
+    keyboard = []
+    for choice in choices:
+        # 当前值显示为选中状态
+        button_text = f"✓ {choice}" if choice == current_value else choice
+        keyboard.append([
+            InlineKeyboardButton(
+                button_text,
+                callback_data=f"setting_set:{config_key}:{choice}"
+            )
+        ])
+    
+    keyboard.append([
+        InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
+    ])
+    return text, keyboard
+
+
+# 配置项类型 -> 输入提示构建函数，返回 (提示正文, 键盘行列表)
+_PROMPT_HANDLERS = {
+    'bool': _prompt_bool,
+    'int': _prompt_int,
+    'string': _prompt_string,
+    'float': _prompt_float,
+    'choice': _prompt_choice,
+}
+
+
+# /ai_status 使用统计缓存时间（秒）
+_AI_STATS_TTL = 60
+
+
+def _get_ai_usage_stats(context, db_storage) -> Tuple[int, int, int, int, int]:
+    """
+    获取AI使用统计（结果缓存在 bot_data 中，避免每次 /ai_status 都扫描归档表）
+    
+    缓存以数据库的数据版本（PRAGMA data_version + 本连接变更计数）为键：
+    版本未变说明期间没有任何连接写入（含备份恢复），直接复用；
+    拿不到数据版本时退回按 _AI_STATS_TTL 秒过期
+    
+    Returns:
+        (总归档数, AI摘要数, AI关键点数, AI分类数, AI标签数)
+    """
+    changes = getattr(db_storage.db, 'data_version', None)
+    cached = context.bot_data.get('_ai_status_stats_cache')
+    if cached:
+        if changes is not None:
+            if cached['changes'] == changes:
+                return cached['data']
+        elif time.monotonic() - cached['ts'] < _AI_STATS_TTL:
+            return cached['data']
+    
+    # 一次查询得到基本统计和AI生成的标签数量（标签类型为'ai'）
+    cursor = db_storage.db.execute("""
+        SELECT 
+            COUNT(*) as total,
+            COUNT(CASE WHEN ai_summary IS NOT NULL AND ai_summary != '' THEN 1 END) as with_summary,
+            COUNT(CASE WHEN ai_key_points IS NOT NULL AND ai_key_points != '' THEN 1 END) as with_key_points,
+            COUNT(CASE WHEN ai_category IS NOT NULL AND ai_category != '' THEN 1 END) as with_category,
+            (
+                SELECT COUNT(DISTINCT at.archive_id)
+                FROM archive_tags at
+                INNER JOIN tags t ON at.tag_id = t.id
+                INNER JOIN archives a ON at.archive_id = a.id
+                WHERE t.tag_type = 'ai' AND a.deleted = 0
+            ) as with_ai_tags
+        FROM archives
+        WHERE deleted = 0
+    """)
+    data = tuple(cursor.fetchone())
+    context.bot_data['_ai_status_stats_cache'] = {'ts': time.monotonic(), 'changes': changes, 'data': data}
+    return data
+
+
 class SystemFormatter:
     """系统格式化器 - 处理系统功能相关的消息格式化"""
     
@@ -36,24 +293,31 @@ class SystemFormatter:
         if count == 0:
             return lang_ctx.t('trash_empty')
         
-        result_text = lang_ctx.t('trash_list', count=count) + "\n\n"
-        
-        for item in items[:max_display]:
-            result_text += f"🗑️ ID: #{item['id']}\n"
-            result_text += f"📝 {item['title']}\n"
-            result_text += f"🏷️ {', '.join(item['tags'][:3])}{'...' if len(item['tags']) > 3 else ''}\n"
-            result_text += f"🕐 {lang_ctx.t('deleted_at')}: {item['deleted_at']}\n\n"
+        parts = [lang_ctx.t('trash_list', count=count), "\n\n"]
+        
+        deleted_label = lang_ctx.t('deleted_at')
+        for item in itertools.islice(items, max_display):
+            tags = item['tags']
+            tags_preview = ', '.join(tags[:3])
+            ellipsis = '...' if len(tags) > 3 else ''
+            parts.append(
+                f"🗑️ ID: #{item['id']}\n"
+                f"📝 {item['title']}\n"
+                f"🏷️ {tags_preview}{ellipsis}\n"
+                f"🕐 {deleted_label}: {item['deleted_at']}\n\n"
+            )
         
         if count > max_display:
-            result_text += lang_ctx.t('trash_more', count=count - max_display)
+            parts.append(lang_ctx.t('trash_more', count=count - max_display))
         
-        return result_text
+        return "".join(parts)
     
     @staticmethod
     def format_ai_status(
         ai_config: Dict[str, Any],
         context,
-        lang_ctx
+        lang_ctx,
+        ai_view: Optional[AiConfigView] = None
     ) -> str:
         """
         格式化AI功能状态显示
@@ -62,32 +326,26 @@ class SystemFormatter:
             ai_config: AI配置
             context: Bot context
             lang_ctx: 语言上下文
+            ai_view: 预先展开的AI配置视图（可选，未提供时由 ai_config 构建）
             
         Returns:
             格式化的状态文本（Markdown格式）
         """
-        from ...ai.summarizer import get_ai_summarizer
+        if ai_view is None:
+            ai_view = AiConfigView.from_dict(ai_config)
         
-        status_text = "🤖 **AI 功能状态**\n\n"
+        parts = ["🤖 **AI 功能状态**\n\n"]
         
-        if ai_config.get('enabled', False):
-            status_text += "✅ **状态：** 已启用\n\n"
+        if ai_view.enabled:
+            parts.append("✅ **状态：** 已启用\n\n")
             
             summarizer = get_ai_summarizer(ai_config)
             
             if summarizer and summarizer.is_available():
-                status_text += "🟢 **服务：** 可用\n\n"
-                
-                api_config = ai_config.get('api', {})
+                parts.append("🟢 **服务：** 可用\n\n")
                 
-                # 优先从环境变量读取，否则从配置文件读取
-                import os
-                provider = os.getenv('AI_API_PROVIDER') or api_config.get('provider', '') or 'unknown'
-                model = os.getenv('AI_MODEL') or api_config.get('model', '') or 'unknown'
-                base_url = os.getenv('AI_API_URL') or api_config.get('api_url', '') or api_config.get('base_url', 'default')
-                
-                # API Key处理
-                api_key = os.getenv('AI_API_KEY') or api_config.get('api_key', '')
+                # 环境变量覆盖已在 AiConfigView 构建时按 _ENV_MAPPING 解析
+                api_key = ai_view.api_key
                 if api_key:
                     if len(api_key) > 10:
                         masked_key = api_key[:4] + '****' + api_key[-4:]
@@ -96,65 +354,39 @@ class SystemFormatter:
                 else:
                     masked_key = '未设置'
                 
-                status_text += "⚙️ **配置信息：**\n"
-                status_text += f"  • 提供商：`{provider}`\n"
-                status_text += f"  • 模型：`{model}`\n"
-                status_text += f"  • API Key：`{masked_key}`\n"
-                status_text += f"  • Base URL：`{base_url}`\n"
-                status_text += f"  • 最大Token：`{api_config.get('max_tokens', 1000)}`\n"
-                status_text += f"  • 超时时间：`{api_config.get('timeout', 30)}秒`\n"
-                status_text += f"  • 温度参数：`{api_config.get('temperature', 0.7)}`\n\n"
+                parts.append("⚙️ **配置信息：**\n")
+                parts.append(f"  • 提供商：`{ai_view.provider}`\n")
+                parts.append(f"  • 模型：`{ai_view.model}`\n")
+                parts.append(f"  • API Key：`{masked_key}`\n")
+                parts.append(f"  • Base URL：`{ai_view.base_url}`\n")
+                parts.append(f"  • 最大Token：`{ai_view.max_tokens}`\n")
+                parts.append(f"  • 超时时间：`{ai_view.timeout}秒`\n")
+                parts.append(f"  • 温度参数：`{ai_view.temperature}`\n\n")
                 
-                status_text += "🔧 **功能开关：**\n"
-                auto_summarize = ai_config.get('auto_summarize', False)
-                auto_tags = ai_config.get('auto_generate_tags', False)
-                auto_category = ai_config.get('auto_category', False)
-                chat_enabled = ai_config.get('chat_enabled', False)  # 修正：直接从ai_config读取
+                parts.append("🔧 **功能开关：**\n")
+                chat_enabled = ai_view.chat_enabled
                 
-                status_text += f"  • 自动摘要：{'✅ 开启' if auto_summarize else '❌ 关闭'}\n"
-                status_text += f"  • 自动标签：{'✅ 开启' if auto_tags else '❌ 关闭'}\n"
-                status_text += f"  • 自动分类：{'✅ 开启' if auto_category else '❌ 关闭'}\n"
-                status_text += f"  • 智能对话：{'✅ 开启' if chat_enabled else '❌ 关闭'}\n\n"
+                parts.append(f"  • 自动摘要：{'✅ 开启' if ai_view.auto_summarize else '❌ 关闭'}\n")
+                parts.append(f"  • 自动标签：{'✅ 开启' if ai_view.auto_tags else '❌ 关闭'}\n")
+                parts.append(f"  • 自动分类：{'✅ 开启' if ai_view.auto_category else '❌ 关闭'}\n")
+                parts.append(f"  • 智能对话：{'✅ 开启' if chat_enabled else '❌ 关闭'}\n\n")
                 
                 db_storage = context.bot_data.get('db_storage')
                 if db_storage:
                     try:
-                        # 查询基本统计
-                        cursor = db_storage.db.execute("""
-                            SELECT 
-                                COUNT(*) as total,
-                                COUNT(CASE WHEN ai_summary IS NOT NULL AND ai_summary != '' THEN 1 END) as with_summary,
-                                COUNT(CASE WHEN ai_key_points IS NOT NULL AND ai_key_points != '' THEN 1 END) as with_key_points,
-                                COUNT(CASE WHEN ai_category IS NOT NULL AND ai_category != '' THEN 1 END) as with_category
-                            FROM archives
-                            WHERE deleted = 0
-                        """)
-                        stats = cursor.fetchone()
-                        
-                        total = stats[0]
-                        with_summary = stats[1]
-                        with_key_points = stats[2]
-                        with_category = stats[3]
+                        total, with_summary, with_key_points, with_category, with_ai_tags = _get_ai_usage_stats(
+                            context, db_storage
+                        )
                         
-                        # 查询AI生成的标签数量（标签类型为'ai'）
-                        cursor = db_storage.db.execute("""
-                            SELECT COUNT(DISTINCT at.archive_id)
-                            FROM archive_tags at
-                            INNER JOIN tags t ON at.tag_id = t.id
-                            INNER JOIN archives a ON at.archive_id = a.id
-                            WHERE t.tag_type = 'ai' AND a.deleted = 0
-                        """)
-                        with_ai_tags = cursor.fetchone()[0]
-                        
-                        status_text += "📊 **使用统计：**\n"
-                        status_text += f"  • 总归档数：`{total}`\n"
-                        status_text += f"  • AI摘要：`{with_summary}` ({int(with_summary/total*100) if total > 0 else 0}%)\n"
-                        status_text += f"  • AI标签：`{with_ai_tags}` ({int(with_ai_tags/total*100) if total > 0 else 0}%)\n"
-                        status_text += f"  • AI关键点：`{with_key_points}` ({int(with_key_points/total*100) if total > 0 else 0}%)\n"
-                        status_text += f"  • AI分类：`{with_category}` ({int(with_category/total*100) if total > 0 else 0}%)\n\n"
+                        parts.append("📊 **使用统计：**\n")
+                        parts.append(f"  • 总归档数：`{total}`\n")
+                        parts.append(f"  • AI摘要：`{with_summary}` ({(with_summary * 100 // total) if total else 0}%)\n")
+                        parts.append(f"  • AI标签：`{with_ai_tags}` ({(with_ai_tags * 100 // total) if total else 0}%)\n")
+                        parts.append(f"  • AI关键点：`{with_key_points}` ({(with_key_points * 100 // total) if total else 0}%)\n")
+                        parts.append(f"  • AI分类：`{with_category}` ({(with_category * 100 // total) if total else 0}%)\n\n")
                     except Exception as e:
                         logger.warning(f"Failed to get AI usage stats: {e}", exc_info=True)
-                        status_text += "📊 **使用统计：** 无法获取\n\n"
+                        parts.append("📊 **使用统计：** 无法获取\n\n")
                 
                 if chat_enabled:
                     session_manager = context.bot_data.get('session_manager')
@@ -163,45 +395,46 @@ class SystemFormatter:
                         if user_id:
                             session = session_manager.get_session(user_id)
                             if session:
-                                status_text += "💬 **对话会话：**\n"
-                                status_text += f"  • 状态：活跃\n"
-                                status_text += f"  • 消息数：`{session.get('message_count', 0)}`\n"
+                                parts.append("💬 **对话会话：**\n")
+                                parts.append(f"  • 状态：活跃\n")
+                                parts.append(f"  • 消息数：`{session.get('message_count', 0)}`\n")
                                 last_time = session.get('last_interaction')
                                 if last_time:
-                                    status_text += f"  • 最后交互：`{last_time}`\n"
+                                    parts.append(f"  • 最后交互：`{last_time}`\n")
                             else:
-                                status_text += "💬 **对话会话：** 无活跃会话\n"
-                            status_text += "\n"
+                                parts.append("💬 **对话会话：** 无活跃会话\n")
+                            parts.append("\n")
                 
                 ai_cache = context.bot_data.get('ai_cache')
                 if ai_cache:
                     try:
                         cache_stats = ai_cache.get_stats()
-                        status_text += "💾 **缓存统计：**\n"
-                        status_text += f"  • 缓存条目：`{cache_stats.get('total_entries', 0)}`\n"
-                        status_text += f"  • 命中率：`{cache_stats.get('hit_rate', 0):.1f}%`\n"
-                        status_text += f"  • 缓存大小：`{cache_stats.get('size_mb', 0):.2f} MB`\n"
+                        parts.append("💾 **缓存统计：**\n")
+                        parts.append(f"  • 缓存条目：`{cache_stats.get('total_entries', 0)}`\n")
+                        parts.append(f"  • 命中率：`{cache_stats.get('hit_rate', 0):.1f}%`\n")
+                        parts.append(f"  • 缓存大小：`{cache_stats.get('size_mb', 0):.2f} MB`\n")
                     except Exception as e:
                         logger.warning(f"Failed to get cache stats: {e}")
                 
             else:
-                status_text += "🔴 **服务：** 不可用\n\n"
-                status_text += "⚠️ AI服务连接失败，请检查配置\n"
+                parts.append("🔴 **服务：** 不可用\n\n")
+                parts.append("⚠️ AI服务连接失败，请检查配置\n")
         else:
-            status_text += "❌ **状态：** 未启用\n\n"
-            status_text += "💡 **启用指南：**\n"
-            status_text += "1. 编辑 `config/config.yaml`\n"
-            status_text += "2. 设置 `ai.enabled: true`\n"
-            status_text += "3. 配置API密钥和提供商\n"
-            status_text += "4. 重启Bot\n"
-        
-        return status_text
+            parts.append("❌ **状态：** 未启用\n\n")
+            parts.append("💡 **启用指南：**\n")
+            parts.append("1. 编辑 `config/config.yaml`\n")
+            parts.append("2. 设置 `ai.enabled: true`\n")
+            parts.append("3. 配置API密钥和提供商\n")
+            parts.append("4. 重启Bot\n")
+        
+        return "".join(parts)
     
     @staticmethod
     def format_setting_category_menu(
         category_key: str,
         category_info: Dict[str, Any],
-        config_getter
+        config_getter,
+        config_getter_bulk: Optional[Callable[[List[str]], Dict[str, Any]]] = None
     ) -> tuple[str, Any]:
         """
         格式化配置分类菜单
@@ -210,6 +443,7 @@ class SystemFormatter:
             category_key: 分类键
             category_info: 分类信息
             config_getter: 获取配置值的函数
+            config_getter_bulk: 批量获取配置值的函数（可选，提供时一次取回所有配置项）
             
         Returns:
             (格式化的消息文本, InlineKeyboardMarkup)
@@ -221,30 +455,21 @@ class SystemFormatter:
         text = f"{category_icon} <b>{category_name}</b>\n\n"
         text += "选择要配置的项目：\n\n"
         
-        keyboard = []
-        for config_key, item_info in items.items():
-            item_name = item_info['name']
-            current_value = config_getter(config_key)
-            
-            if item_info['type'] == 'bool':
-                value_display = "✅" if current_value else "❌"
-            elif item_info['type'] == 'float':
-                value_display = f"{current_value:.2f}" if current_value is not None else "未设置"
-            elif item_info['type'] == 'choice':
-                value_display = str(current_value) if current_value else "未设置"
-            else:
-                value_display = str(current_value) if current_value is not None else "未设置"
-            
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{item_name} [{value_display}]",
-                    callback_data=f"setting_item:{config_key}"
-                )
-            ])
-        
-        keyboard.append([
-            InlineKeyboardButton("⬅️ 返回", callback_data="setting_back")
-        ])
+        # 一次取回本分类全部配置值，避免逐项查询
+        if config_getter_bulk is not None:
+            values = config_getter_bulk(list(items))
+        else:
+            values = {config_key: config_getter(config_key) for config_key in items}
+        
+        Btn = InlineKeyboardButton
+        keyboard = [
+            [Btn(
+                f"{item_info['name']} [{_setting_value_display(item_info['type'], values.get(config_key))}]",
+                callback_data=f"setting_item:{config_key}"
+            )]
+            for config_key, item_info in items.items()
+        ]
+        keyboard.append([Btn("⬅️ 返回", callback_data="setting_back")])
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
@@ -276,111 +501,13 @@ class SystemFormatter:
         text = f"⚙️ <b>{item_name}</b>\n\n"
         text += f"📝 {description}\n\n"
         
-        keyboard = []
-        
-        if item_type == 'bool':
-            # 布尔类型：显示状态和切换按钮
-            status_text = "✅ 已启用" if current_value else "❌ 已禁用"
-            text += f"当前状态：{status_text}\n"
-            
-            # 根据当前状态显示相反的操作按钮
-            if current_value:
-                keyboard = [
-                    [InlineKeyboardButton("❌ 禁用", callback_data=f"setting_set:{config_key}:false")],
-                    [InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")]
-                ]
-            else:
-                keyboard = [
-                    [InlineKeyboardButton("✅ 启用", callback_data=f"setting_set:{config_key}:true")],
-                    [InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")]
-                ]
-        
-        elif item_type == 'int':
-            text += f"当前值：<code>{current_value}</code>\n\n"
-            
-            min_val = item_info.get('min')
-            max_val = item_info.get('max')
-            default_val = item_info.get('default')
-            
-            text += "请输入新值（整数）：\n"
-            if min_val is not None:
-                text += f"• 最小值：{min_val}\n"
-            if max_val is not None:
-                text += f"• 最大值：{max_val}\n"
-            if default_val is not None:
-                text += f"• 默认值：{default_val}\n"
-            
-            text += f"\n💡 直接回复数字即可"
-            
-            keyboard = [[
-                InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
-            ]]
-        
-        elif item_type == 'string':
-            text += f"当前值：<code>{current_value}</code>\n\n"
-            
-            example = item_info.get('example', '')
-            
-            text += "请输入新值（文本）：\n"
-            if example:
-                text += f"• 示例：<code>{example}</code>\n"
-            
-            text += f"\n💡 直接回复文本即可"
-            
-            keyboard = [[
-                InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
-            ]]
-        
-        elif item_type == 'float':
-            text += f"当前值：<code>{current_value}</code>\n\n"
-            
-            min_val = item_info.get('min')
-            max_val = item_info.get('max')
-            default_val = item_info.get('default')
-            step = item_info.get('step', 0.1)
-            
-            text += "请输入新值（小数）：\n"
-            if min_val is not None:
-                text += f"• 最小值：{min_val}\n"
-            if max_val is not None:
-                text += f"• 最大值：{max_val}\n"
-            if default_val is not None:
-                text += f"• 默认值：{default_val}\n"
-            if step:
-                text += f"• 步进：{step}\n"
-            
-            text += f"\n💡 直接回复数字即可"
-            
-            keyboard = [[
-                InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
-            ]]
-        
-        elif item_type == 'choice':
-            text += f"当前值：<code>{current_value}</code>\n\n"
-            choices = item_info.get('choices', [])
-            default_val = item_info.get('default')
-            
-            text += "请选择新值：\n"
-            for choice in choices:
-                marker = "• " if choice != current_value else "✓ "
-                text += f"{marker}{choice}\n"
-            if default_val:
-                text += f"\n默认值：{default_val}\n"
-            
+        # 按类型分派到对应的提示构建函数；未知类型只显示公共头部
+        handler = _PROMPT_HANDLERS.get(item_type)
+        if handler is not None:
+            body, keyboard = handler(item_info, config_key, current_value, category_key)
+            text += body
+        else:
             keyboard = []
-            for choice in choices:
-                # 当前值显示为选中状态
-                button_text = f"✓ {choice}" if choice == current_value else choice
-                keyboard.append([
-                    InlineKeyboardButton(
-                        button_text,
-                        callback_data=f"setting_set:{config_key}:{choice}"
-                    )
-                ])
-            
-            keyboard.append([
-                InlineKeyboardButton("⬅️ 返回", callback_data=f"setting_cat:{category_key}")
-            ])
         
         reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
         
@@ -399,10 +526,7 @@ class SystemFormatter:
         Returns:
             格式化后的统计文本
         """
-        from ..helpers import format_file_size
-        from ..i18n import I18n
-        
-        i18n = I18n(language)
+        i18n = _i18n(language)
         
         total_archives = stats.get('total_archives', 0) or stats.get('total', 0)
         total_tags = stats.get('total_tags', 0) or stats.get('tags', 0)
@@ -415,39 +539,25 @@ class SystemFormatter:
         
         if db_size_formatted:
             # 完整版本（命令使用）
-            message = i18n.t(
+            parts = [i18n.t(
                 'stats',
                 total_archives=total_archives,
                 total_tags=total_tags,
                 storage_used=total_size,
                 db_size=db_size_formatted,
                 last_archive=last_archive
-            )
+            )]
             
             # 添加类型统计
             if type_stats:
-                message += "\n\n📂 **类型统计：**\n"
-                type_emoji = {
-                    'text': '📝',
-                    'link': '🔗',
-                    'image': '🖼️',
-                    'video': '🎬',
-                    'audio': '🎵',
-                    'voice': '🎤',
-                    'document': '📄',
-                    'ebook': '📚',
-                    'animation': '🎞️',
-                    'sticker': '🎭',
-                    'contact': '👤',
-                    'location': '📍'
-                }
+                parts.append("\n\n📂 **类型统计：**\n")
                 
                 # 按数量排序
-                sorted_types = sorted(type_stats.items(), key=lambda x: x[1], reverse=True)
+                sorted_types = sorted(type_stats.items(), key=itemgetter(1), reverse=True)
                 for content_type, count in sorted_types:
-                    emoji = type_emoji.get(content_type, '📦')
-                    percentage = int(count / total_archives * 100) if total_archives > 0 else 0
-                    message += f"  {emoji} {content_type}: `{count}` ({percentage}%)\n"
+                    emoji = _TYPE_EMOJI.get(content_type, '📦')
+                    percentage = (count * 100 // total_archives) if total_archives else 0
+                    parts.append(f"  {emoji} {content_type}: `{count}` ({percentage}%)\n")
             
             # 添加笔记统计
             total_notes = stats.get('total_notes', 0)
@@ -455,35 +565,22 @@ class SystemFormatter:
             standalone_notes = stats.get('standalone_notes', 0)
             
             if total_notes > 0:
-                message += "\n📝 **笔记统计：**\n"
-                message += f"  • 总笔记数：`{total_notes}`\n"
-                message += f"  • 关联笔记：`{linked_notes}` ({int(linked_notes/total_notes*100) if total_notes > 0 else 0}%)\n"
-                message += f"  • 独立笔记：`{standalone_notes}` ({int(standalone_notes/total_notes*100) if total_notes > 0 else 0}%)\n"
+                parts.append("\n📝 **笔记统计：**\n")
+                parts.append(f"  • 总笔记数：`{total_notes}`\n")
+                parts.append(f"  • 关联笔记：`{linked_notes}` ({(linked_notes * 100 // total_notes) if total_notes else 0}%)\n")
+                parts.append(f"  • 独立笔记：`{standalone_notes}` ({(standalone_notes * 100 // total_notes) if total_notes else 0}%)\n")
         else:
             # 简化版本（AI对话使用）- 重要：必须清晰表达"有数据"
-            if language == 'en':
-                message = f"📊 System Statistics:\n"
-                message += f"• Total Archives: {total_archives}\n"
-                message += f"• Total Tags: {total_tags}\n"
-                message += f"• Storage Used: {total_size}\n"
-                if total_archives > 0:
-                    message += f"✅ User has {total_archives} archived items"
-            elif language == 'zh-TW':
-                message = f"📊 系統統計：\n"
-                message += f"• 歸檔總數：{total_archives}\n"
-                message += f"• 標籤總數：{total_tags}\n"
-                message += f"• 存儲使用：{total_size}\n"
-                if total_archives > 0:
-                    message += f"✅ 用戶已有 {total_archives} 條歸檔記錄"
-            else:
-                message = f"📊 系统统计：\n"
-                message += f"• 归档总数：{total_archives}\n"
-                message += f"• 标签总数：{total_tags}\n"
-                message += f"• 存储使用：{total_size}\n"
-                if total_archives > 0:
-                    message += f"✅ 用户已有 {total_archives} 条归档记录"
-        
-        return message
+            msgs = _AI_CONTEXT_MSGS.get(language, _AI_CONTEXT_MSGS['zh-CN'])
+            parts = [msgs['stats_brief'].format(
+                total_archives=total_archives,
+                total_tags=total_tags,
+                total_size=total_size
+            )]
+            if total_archives > 0:
+                parts.append(msgs['stats_has_data'].format(total_archives=total_archives))
+        
+        return "".join(parts)
     
     @staticmethod
     def format_search_results_summary(
@@ -506,36 +603,24 @@ class SystemFormatter:
         Returns:
             格式化后的搜索结果摘要文本
         """
+        msgs = _AI_CONTEXT_MSGS.get(language, _AI_CONTEXT_MSGS['zh-CN'])
+        
         if not results:
-            if language == 'en':
-                return f"🔍 No results found for '{query}'"
-            elif language == 'zh-TW':
-                return f"🔍 沒有找到關於「{query}」的結果"
-            else:
-                return f"🔍 没有找到关于「{query}」的结果"
+            return msgs['search_empty'].format(query=query)
         
-        if language == 'en':
-            text = f"🔍 Found {total_count} result(s) for '{query}':\n\n"
-        elif language == 'zh-TW':
-            text = f"🔍 找到 {total_count} 個關於「{query}」的結果：\n\n"
-        else:
-            text = f"🔍 找到 {total_count} 个关于「{query}」的结果：\n\n"
+        lines = [msgs['search_header'].format(total_count=total_count, query=query)]
         
-        for i, item in enumerate(results[:max_items], 1):
-            title = item.get('title', 'No title' if language == 'en' else '無標題' if language == 'zh-TW' else '无标题')
+        no_title = msgs['no_title']
+        for i, item in enumerate(itertools.islice(results, max_items), 1):
+            title = item.get('title', no_title)
             if len(title) > 50:
                 title = title[:50] + '...'
-            text += f"{i}. {title}\n"
+            lines.append(f"{i}. {title}\n")
         
         if total_count > max_items:
-            if language == 'en':
-                text += f"\n... and {total_count - max_items} more"
-            elif language == 'zh-TW':
-                text += f"\n...還有 {total_count - max_items} 個"
-            else:
-                text += f"\n...还有 {total_count - max_items} 个"
+            lines.append(msgs['search_more'].format(remaining=total_count - max_items))
         
-        return text
+        return "".join(lines)
     
     @staticmethod
     def format_tag_analysis(
@@ -554,28 +639,17 @@ class SystemFormatter:
         Returns:
             格式化后的标签分析文本
         """
+        msgs = _AI_CONTEXT_MSGS.get(language, _AI_CONTEXT_MSGS['zh-CN'])
+        
         if not tags:
-            if language == 'en':
-                return "No tags available"
-            elif language == 'zh-TW':
-                return "暫無標籤"
-            else:
-                return "暂无标签"
-        
-        tag_texts = []
-        for tag in tags[:max_tags]:
-            tag_name = tag.get('tag') or tag.get('tag_name')
-            count = tag.get('count', 0)
-            tag_texts.append(f"#{tag_name}({count})")
-        
-        if language == 'en':
-            header = f"🏷️ Top {len(tag_texts)} Tags:\n"
-        elif language == 'zh-TW':
-            header = f"🏷️ 熱門標籤 TOP {len(tag_texts)}：\n"
-        else:
-            header = f"🏷️ 热门标签 TOP {len(tag_texts)}：\n"
+            return msgs['tags_empty']
+        
+        tag_texts = [
+            f"#{tag.get('tag') or tag.get('tag_name')}({tag.get('count', 0)})"
+            for tag in tags[:max_tags]
+        ]
         
-        return header + ' '.join(tag_texts)
+        return msgs['tags_header'].format(count=len(tag_texts)) + ' '.join(tag_texts)
     
     @staticmethod
     def format_recent_archives(
@@ -594,29 +668,19 @@ class SystemFormatter:
         Returns:
             格式化后的最近归档文本
         """
-        if not archives:
-            if language == 'en':
-                return "No recent archives"
-            elif language == 'zh-TW':
-                return "暫無最近歸檔"
-            else:
-                return "暂无最近归档"
+        msgs = _AI_CONTEXT_MSGS.get(language, _AI_CONTEXT_MSGS['zh-CN'])
         
-        if language == 'en':
-            header = f"📚 Recent {len(archives[:max_items])} Archives:\n"
-        elif language == 'zh-TW':
-            header = f"📚 最近 {len(archives[:max_items])} 條歸檔：\n"
-        else:
-            header = f"📚 最近 {len(archives[:max_items])} 条归档：\n"
+        if not archives:
+            return msgs['recent_empty']
         
-        text = header
-        for archive in archives[:max_items]:
+        lines = [msgs['recent_header'].format(count=min(len(archives), max_items))]
+        for archive in itertools.islice(archives, max_items):
             title = archive.get('title', '')
             if len(title) > 40:
                 title = title[:40] + '...'
-            text += f"• {title}\n"
+            lines.append(f"• {title}\n")
         
-        return text
+        return "".join(lines)
     
     @staticmethod
     def format_ai_context_summary(
@@ -635,57 +699,67 @@ class SystemFormatter:
         Returns:
             格式化后的数据摘要文本
         """
-        parts = []
+        msgs = _AI_CONTEXT_MSGS.get(language, _AI_CONTEXT_MSGS['zh-CN'])
+        
+        # 空上下文直接返回，无需逐项探测
+        if not data_context:
+            return msgs['no_data']
         
         # 扩展：general_query也需要显示统计数据
-        show_stats = user_intent in ['general_query', 'specific_search', 'stats_analysis', 'resource_request']
+        show_stats = user_intent in _STATS_INTENTS
         
-        if data_context.get('statistics') and show_stats:
-            stats = data_context['statistics']
-            parts.append(SystemFormatter.format_stats(stats, language, db_size=0))
-            
-            if data_context.get('onboarding_hint'):
-                parts.append(data_context['onboarding_hint'])
-            if data_context.get('tagging_hint'):
-                parts.append(data_context['tagging_hint'])
-        
-        if data_context.get('search_results'):
-            results = data_context['search_results']
-            query = data_context.get('search_query', '')
-            parts.append(SystemFormatter.format_search_results_summary(results, len(results), query, language))
-            
-            if data_context.get('filter_suggestions'):
-                parts.append(data_context['filter_suggestions'])
-            if data_context.get('expand_suggestions'):
-                parts.append(data_context['expand_suggestions'])
-            if data_context.get('empty_result_suggestions'):
-                parts.append(data_context['empty_result_suggestions'])
-        
-        if data_context.get('tag_analysis'):
-            tags = data_context['tag_analysis']
-            parts.append(SystemFormatter.format_tag_analysis(tags, language))
-        
-        if data_context.get('sample_archives'):
-            archives = data_context['sample_archives']
-            parts.append(SystemFormatter.format_recent_archives(archives, language))
-        
-        if data_context.get('notes'):
-            from .note_formatter import NoteFormatter
-            notes = data_context['notes']
-            total_count = data_context.get('notes_total_count', len(notes))  # 获取总数
-            parts.append(NoteFormatter.format_ai_summary(notes, language, total_count=total_count))
-        
-        if data_context.get('no_resource_hint'):
-            parts.append(data_context['no_resource_hint'])
-        if data_context.get('next_hint'):
-            parts.append(data_context['next_hint'])
+        parts = []
+        for key, formatter, hint_keys in _CONTEXT_SECTIONS:
+            if not data_context.get(key) or (key == 'statistics' and not show_stats):
+                continue
+            parts.append(formatter(data_context, language))
+            parts.extend(data_context[h] for h in hint_keys if data_context.get(h))
+        
+        parts.extend(data_context[h] for h in _CONTEXT_TRAILING_HINTS if data_context.get(h))
         
         if not parts:
-            if language == 'en':
-                return "No relevant data available"
-            elif language == 'zh-TW':
-                return "暫無相關數據"
-            else:
-                return "暂无相关数据"
+            return msgs['no_data']
         
         return '\n\n'.join(parts)
+
+
+# ==================== AI上下文摘要分段 ====================
+
+def _context_statistics(data_context: Dict[str, Any], language: str) -> str:
+    return SystemFormatter.format_stats(data_context['statistics'], language, db_size=0)
+
+
+def _context_search_results(data_context: Dict[str, Any], language: str) -> str:
+    results = data_context['search_results']
+    query = data_context.get('search_query', '')
+    return SystemFormatter.format_search_results_summary(results, len(results), query, language)
+
+
+def _context_tag_analysis(data_context: Dict[str, Any], language: str) -> str:
+    return SystemFormatter.format_tag_analysis(data_context['tag_analysis'], language)
+
+
+def _context_sample_archives(data_context: Dict[str, Any], language: str) -> str:
+    return SystemFormatter.format_recent_archives(data_context['sample_archives'], language)
+
+
+def _context_notes(data_context: Dict[str, Any], language: str) -> str:
+    notes = data_context['notes']
+    total_count = data_context.get('notes_total_count', len(notes))  # 获取总数
+    return _format_notes_summary(notes, language, total_count=total_count)
+
+
+# 需要展示统计数据的用户意图
+_STATS_INTENTS = frozenset({'general_query', 'specific_search', 'stats_analysis', 'resource_request'})
+
+# (数据键, 格式化函数, 紧随其后追加的提示键)，按输出顺序排列
+_CONTEXT_SECTIONS = (
+    ('statistics', _context_statistics, ('onboarding_hint', 'tagging_hint')),
+    ('search_results', _context_search_results, ('filter_suggestions', 'expand_suggestions', 'empty_result_suggestions')),
+    ('tag_analysis', _context_tag_analysis, ()),
+    ('sample_archives', _context_sample_archives, ()),
+    ('notes', _context_notes, ()),
+)
+
+# 所有分段之后追加的提示键
+_CONTEXT_TRAILING_HINTS = ('no_resource_hint', 'next_hint')
@@ -2,16 +2,25 @@
 Helper utility functions
 """
 
-import html
 import logging
 import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional
 from urllib.parse import urlparse
 from .config import get_config
 
 logger = logging.getLogger(__name__)
 
+# HTML转义映射表（输出与 html.escape(quote=True) 一致，str.translate 单次遍历完成）
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+_NEEDS_ESCAPE_RE = re.compile(r'[&<>"\']')
+
 
 def escape_html(text: str) -> str:
     """
@@ -33,7 +42,11 @@ def escape_html(text: str) -> str:
     """
     if not text:
         return text
-    return html.escape(str(text))
+    text = str(text)
+    # 标题、来源等通常不含特殊字符：先用正则快速探测，无需转义时直接返回原字符串
+    if not _NEEDS_ESCAPE_RE.search(text):
+        return text
+    return text.translate(_HTML_ESCAPE_TABLE)
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -324,29 +337,28 @@ async def smart_sort_messages(messages: List[tuple], ai_summarizer=None) -> List
         return sorted_msgs
 
 
-def split_long_message(text: str, max_length: int = 4096, preserve_newlines: bool = True) -> List[str]:
+def iter_split_long_message(text: str, max_length: int = 4096, preserve_newlines: bool = True) -> Iterator[str]:
     """
-    智能分割超长消息为多条消息（Telegram单条消息限制4096字符）
+    智能分割超长消息（生成器版本，逐段产出，已发送的分段可及时释放）
     
     Args:
         text: 要分割的文本
         max_length: 单条消息最大长度（默认4096）
         preserve_newlines: 是否在段落边界分割（优先在\\n\\n处分割）
         
-    Returns:
-        分割后的消息列表
+    Yields:
+        分割后的单条消息
     """
-    if not text or len(text) <= max_length:
-        return [text] if text else []
+    if not text:
+        return
     
-    parts = []
     remaining = text
     
     while remaining:
         if len(remaining) <= max_length:
-            # 剩余内容小于限制，直接添加
-            parts.append(remaining)
-            break
+            # 剩余内容小于限制，直接产出
+            yield remaining
+            return
         
         # 寻找合适的分割点
         split_pos = max_length
@@ -367,11 +379,26 @@ def split_long_message(text: str, max_length: int = 4096, preserve_newlines: boo
                     if last_space > max_length * 0.7:
                         split_pos = last_space + 1  # +1 包含空格
         
-        # 分割并添加到列表
-        parts.append(remaining[:split_pos])
+        # 分割并产出
+        yield remaining[:split_pos]
         remaining = remaining[split_pos:]
+
+
+def split_long_message(text: str, max_length: int = 4096, preserve_newlines: bool = True) -> List[str]:
+    """
+    智能分割超长消息为多条消息（Telegram单条消息限制4096字符）
     
-    logger.debug(f"Split long message into {len(parts)} parts (original length: {len(text)})")
+    Args:
+        text: 要分割的文本
+        max_length: 单条消息最大长度（默认4096）
+        preserve_newlines: 是否在段落边界分割（优先在\\n\\n处分割）
+        
+    Returns:
+        分割后的消息列表
+    """
+    parts = list(iter_split_long_message(text, max_length, preserve_newlines))
+    if len(parts) > 1:
+        logger.debug(f"Split long message into {len(parts)} parts (original length: {len(text)})")
     return parts
 
 
@@ -633,6 +660,31 @@ def validate_telegram_id(telegram_id: int) -> bool:
     return telegram_id != 0 and isinstance(telegram_id, int)
 
 
+def build_tg_link(storage_path: str, default_channel: Optional[Any] = None) -> Optional[str]:
+    """
+    Build the t.me/c/ message link for a telegram storage path
+    
+    Args:
+        storage_path: "channel_id:message_id[:file_id]" or a bare message ID
+        default_channel: Channel ID used when storage_path has no channel part;
+            without it a bare message ID has no link
+        
+    Returns:
+        https://t.me/c/<channel>/<message> link, or None if it cannot be built
+    """
+    channel_id, sep, rest = storage_path.partition(':')
+    if sep:
+        message_id = rest.partition(':')[0]
+    elif default_channel is not None:
+        channel_id, message_id = str(default_channel), storage_path
+    else:
+        return None
+    
+    # t.me/c/ 链接使用去掉 -100 前缀的短格式
+    channel_id = channel_id[4:] if channel_id.startswith('-100') else channel_id.lstrip('-')
+    return f"https://t.me/c/{channel_id}/{message_id}"
+
+
 def get_content_type_emoji(content_type: str) -> str:
     """
     Get emoji for content type
@@ -8,9 +8,9 @@ import logging
 from typing import List, Dict, Any, Optional
 from telegram import Bot, Message
 
-from .formatters.archive_formatter import ArchiveFormatter
-from .formatters.note_formatter import NoteFormatter
-from .formatters.system_formatter import SystemFormatter
+# 格式化器在首次调用时才由 formatters 包按需加载（PEP 562），
+# 导入本模块不会连带加载三个格式化器
+from . import formatters
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ class MessageBuilder:
         bot: Optional[Any] = None
     ) -> str:
         """构建归档成功消息"""
-        return await ArchiveFormatter.build_success_message(archive_data, i18n, include_ai_info, bot)
+        return await formatters.ArchiveFormatter.build_success_message(archive_data, i18n, include_ai_info, bot)
     
     @staticmethod
     def format_archive_list(
@@ -45,7 +45,7 @@ class MessageBuilder:
         with_links: bool = True
     ) -> str:
         """格式化归档列表"""
-        return ArchiveFormatter.format_list(archives, i18n, db_instance, with_links)
+        return formatters.ArchiveFormatter.format_list(archives, i18n, db_instance, with_links)
     
     @staticmethod
     def format_text_archive_reply(
@@ -54,7 +54,7 @@ class MessageBuilder:
         db_instance=None
     ) -> tuple[str, Optional[Any]]:
         """格式化文本归档详情"""
-        return ArchiveFormatter.format_text_detail(archive, notes, db_instance)
+        return formatters.ArchiveFormatter.format_text_detail(archive, notes, db_instance)
     
     @staticmethod
     def format_media_archive_caption(
@@ -63,7 +63,7 @@ class MessageBuilder:
         max_length: int = 200
     ) -> str:
         """格式化媒体归档caption"""
-        return ArchiveFormatter.format_media_caption(archive, notes, max_length)
+        return formatters.ArchiveFormatter.format_media_caption(archive, notes, max_length)
     
     @staticmethod
     def build_media_archive_buttons(
@@ -71,7 +71,7 @@ class MessageBuilder:
         has_notes: bool = False
     ) -> Optional[Any]:
         """构建媒体归档按钮"""
-        return ArchiveFormatter.build_media_buttons(archive, has_notes)
+        return formatters.ArchiveFormatter.build_media_buttons(archive, has_notes)
     
     @staticmethod
     def format_other_archive_reply(
@@ -79,7 +79,7 @@ class MessageBuilder:
         has_notes: bool = False
     ) -> tuple[str, Optional[Any]]:
         """格式化其他类型归档详情"""
-        return ArchiveFormatter.format_other_detail(archive, has_notes)
+        return formatters.ArchiveFormatter.format_other_detail(archive, has_notes)
     
     @staticmethod
     async def send_archive_resource(
@@ -90,7 +90,7 @@ class MessageBuilder:
         reply_markup: Optional[Any] = None
     ) -> Optional[Message]:
         """发送归档资源文件"""
-        return await ArchiveFormatter.send_resource(bot, chat_id, archive, caption, reply_markup)
+        return await formatters.ArchiveFormatter.send_resource(bot, chat_id, archive, caption, reply_markup)
     
     @staticmethod
     async def send_archive_resources_batch(
@@ -100,7 +100,7 @@ class MessageBuilder:
         max_count: int = 10
     ) -> int:
         """批量发送归档资源文件"""
-        return await ArchiveFormatter.send_resources_batch(bot, chat_id, archives, max_count)
+        return await formatters.ArchiveFormatter.send_resources_batch(bot, chat_id, archives, max_count)
     
     # ========== 笔记相关方法（委托给 NoteFormatter）==========
     
@@ -113,7 +113,7 @@ class MessageBuilder:
         total_count: int = None
     ) -> tuple[str, Optional[Any]]:
         """构建笔记列表（命令场景）"""
-        return NoteFormatter.format_list(notes, config, lang_ctx, page, total_count)
+        return formatters.NoteFormatter.format_list(notes, config, lang_ctx, page, total_count)
     
     @staticmethod
     def format_note_detail_reply(
@@ -121,7 +121,7 @@ class MessageBuilder:
         archive: Optional[Dict[str, Any]] = None
     ) -> tuple[str, Optional[Any]]:
         """构建单条笔记详情"""
-        return NoteFormatter.format_detail(note, archive)
+        return formatters.NoteFormatter.format_detail(note, archive)
     
     @staticmethod
     def format_note_list_multi(
@@ -130,7 +130,7 @@ class MessageBuilder:
         lang_ctx
     ) -> tuple[str, Any]:
         """格式化多条笔记列表（回调场景）"""
-        return NoteFormatter.format_list_multi(notes, archive_id, lang_ctx)
+        return formatters.NoteFormatter.format_list_multi(notes, archive_id, lang_ctx)
     
     @staticmethod
     def format_note_input_prompt(
@@ -139,7 +139,7 @@ class MessageBuilder:
         note_content: str = None
     ) -> str:
         """格式化笔记输入提示"""
-        return NoteFormatter.format_input_prompt(archive_id, prompt_type, note_content)
+        return formatters.NoteFormatter.format_input_prompt(archive_id, prompt_type, note_content)
     
     @staticmethod
     def format_note_share(
@@ -149,7 +149,7 @@ class MessageBuilder:
         archive_title: str = None
     ) -> str:
         """格式化笔记分享文本"""
-        return NoteFormatter.format_share(note_content, note_created_at, archive_id, archive_title)
+        return formatters.NoteFormatter.format_share(note_content, note_created_at, archive_id, archive_title)
     
     # ========== 系统功能方法（委托给 SystemFormatter）==========
     
@@ -160,25 +160,29 @@ class MessageBuilder:
         max_display: int = 20
     ) -> str:
         """格式化垃圾箱列表"""
-        return SystemFormatter.format_trash_list(items, lang_ctx, max_display)
+        return formatters.SystemFormatter.format_trash_list(items, lang_ctx, max_display)
     
     @staticmethod
     def format_ai_status(
         ai_config: Dict[str, Any],
         context,
-        lang_ctx
+        lang_ctx,
+        ai_view=None
     ) -> str:
         """格式化AI功能状态"""
-        return SystemFormatter.format_ai_status(ai_config, context, lang_ctx)
+        return formatters.SystemFormatter.format_ai_status(ai_config, context, lang_ctx, ai_view)
     
     @staticmethod
     def format_setting_category_menu(
         category_key: str,
         category_info: Dict[str, Any],
-        config_getter
+        config_getter,
+        config_getter_bulk=None
     ) -> tuple[str, Any]:
         """格式化配置分类菜单"""
-        return SystemFormatter.format_setting_category_menu(category_key, category_info, config_getter)
+        return formatters.SystemFormatter.format_setting_category_menu(
+            category_key, category_info, config_getter, config_getter_bulk
+        )
     
     @staticmethod
     def format_setting_item_prompt(
@@ -188,12 +192,12 @@ class MessageBuilder:
         category_key: str
     ) -> tuple[str, Any]:
         """格式化配置项输入提示"""
-        return SystemFormatter.format_setting_item_prompt(item_info, config_key, current_value, category_key)
+        return formatters.SystemFormatter.format_setting_item_prompt(item_info, config_key, current_value, category_key)
     
     @staticmethod
     def format_stats(stats: Dict[str, Any], language: str = 'zh-CN', db_size: int = 0) -> str:
         """格式化统计信息"""
-        return SystemFormatter.format_stats(stats, language, db_size)
+        return formatters.SystemFormatter.format_stats(stats, language, db_size)
     
     @staticmethod
     def format_search_results_summary(
@@ -204,7 +208,7 @@ class MessageBuilder:
         max_items: int = 5
     ) -> str:
         """格式化搜索结果摘要"""
-        return SystemFormatter.format_search_results_summary(results, total_count, query, language, max_items)
+        return formatters.SystemFormatter.format_search_results_summary(results, total_count, query, language, max_items)
     
     @staticmethod
     def format_tag_analysis(
@@ -213,7 +217,7 @@ class MessageBuilder:
         max_tags: int = 10
     ) -> str:
         """格式化标签分析"""
-        return SystemFormatter.format_tag_analysis(tags, language, max_tags)
+        return formatters.SystemFormatter.format_tag_analysis(tags, language, max_tags)
     
     @staticmethod
     def format_recent_archives(
@@ -222,7 +226,7 @@ class MessageBuilder:
         max_items: int = 5
     ) -> str:
         """格式化最近归档列表"""
-        return SystemFormatter.format_recent_archives(archives, language, max_items)
+        return formatters.SystemFormatter.format_recent_archives(archives, language, max_items)
     
     @staticmethod
     def format_ai_context_summary(
@@ -231,4 +235,4 @@ class MessageBuilder:
         language: str = 'zh-CN'
     ) -> str:
         """格式化AI上下文数据摘要"""
-        return SystemFormatter.format_ai_context_summary(data_context, user_intent, language)
+        return formatters.SystemFormatter.format_ai_context_summary(data_context, user_intent, language)